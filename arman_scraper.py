@@ -1,66 +1,20 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
-import jdatetime
-import re
 
-COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
+import persian_date
+import soup_factory
 
-MONTH_MAPPING = {
-    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
-    "تیر": 4, "مرداد": 5, "شهریور": 6,
-    "مهر": 7, "آبان": 8, "آذر": 9,
-    "دی": 10, "بهمن": 11, "اسفند": 12
-}
+# Parts of the archive page parse_archive_page reads. Article pages are
+# parsed whole: the date is read from the parent of the clock icon.
+ARCHIVE_REGIONS = soup_factory.Regions(classes=['archive_posts'])
 
-def convert_to_gregorian(persian_date_str):
-    try:
-        # Example: "21 آذر 1404 ساعت 23:52"
-        # Remove day name if present
-        parts = persian_date_str.split()
-        
-        # Look for day, month, year
-        day, month, year = None, None, None
-        
-        for i, part in enumerate(parts):
-            if part in MONTH_MAPPING:
-                month = MONTH_MAPPING[part]
-                if i > 0 and parts[i-1].isdigit():
-                    day = int(parts[i-1])
-                if i + 1 < len(parts) and parts[i+1].isdigit():
-                    year = int(parts[i+1])
-                break
-        
-        # If not found with simple logic, try regex
-        if not (day and month and year):
-            match = re.search(r'(\d{1,2})\s+([آ-ی]+)\s+(\d{4})', persian_date_str)
-            if match:
-                day = int(match.group(1))
-                month_name = match.group(2)
-                year = int(match.group(3))
-                month = MONTH_MAPPING.get(month_name)
-
-        if day and month and year:
-            # Handle time
-            hour, minute = 0, 0
-            time_match = re.search(r'(\d{1,2}):(\d{1,2})', persian_date_str)
-            if time_match:
-                hour = int(time_match.group(1))
-                minute = int(time_match.group(2))
-                
-            g_date = jdatetime.date(year, month, day).togregorian()
-            return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
-            
-    except Exception as e:
-        # print(f"Date conversion error: {e}")
-        pass
-    return None
+COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
 
 def parse_archive_page(html_content):
     """
     Parses the archive/category page to extract article links.
     Target: class="archive_posts plus_h_post" -> class="plus_post_ftl" -> a[href]
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = soup_factory.make_soup(html_content, ARCHIVE_REGIONS, fast=True)
     links = []
     
     # Based on inspection:
@@ -88,7 +42,7 @@ def parse_article_page(html_content, url):
     Parses the article page to extract details.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content)
         
         data = {col: None for col in COLUMNS}
         data['Link'] = url
@@ -109,7 +63,7 @@ def parse_article_page(html_content, url):
             # Remove label if present
             clean_time = parent_text.replace('تاریخ و زمان ارسال:', '').strip()
             data['Time'] = clean_time
-            data['Gregorian_Date'] = convert_to_gregorian(clean_time)
+            data['Gregorian_Date'] = persian_date.to_gregorian_str(clean_time)
             
         # Image: fetchpriority="high"
         # User example: <img ... fetchpriority="high" ...>
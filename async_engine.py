@@ -0,0 +1,196 @@
+import asyncio
+import socket
+import time
+
+import rate_limiter
+import circuit_breaker
+import http_cache
+import raw_cache
+import http_client
+import parse_pool
+from http_client import (HEADERS, TIMEOUT, ERROR_TIMEOUT, ERROR_DNS, ERROR_CONNECTION, ERROR_OTHER,
+                         ERROR_NOT_FOUND, ERROR_CONTENT_TYPE, ERROR_TOO_LARGE, HOST_FAILURE_ERRORS,
+                         BodyReader, is_allowed_content_type, FetchResult, get_host, classify_status, backoff_delay,
+                         replay)
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Defaults for the async engine. A single event loop can keep hundreds of
+# requests in flight; the per-host limit protects each site from the full burst.
+CONCURRENCY = 200
+PER_HOST_LIMIT = 50
+
+def classify_exception(e):
+    if isinstance(e, asyncio.TimeoutError):
+        return ERROR_TIMEOUT
+    if isinstance(e, aiohttp.ClientConnectorError) and isinstance(e.os_error, socket.gaierror):
+        return ERROR_DNS
+    if isinstance(e, aiohttp.ClientConnectionError):
+        return ERROR_CONNECTION
+    return ERROR_OTHER
+
+async def _read_body(response, url):
+    """
+    Async counterpart of http_client._read_body: streamed, size capped, decoded incrementally.
+    """
+    content_type = response.headers.get('Content-Type')
+    if not is_allowed_content_type(content_type):
+        return None, ERROR_CONTENT_TYPE
+    if response.content_length and response.content_length > http_client.MAX_BYTES:
+        return None, ERROR_TOO_LARGE
+
+    reader = BodyReader(content_type)
+    async for chunk in response.content.iter_chunked(http_client.CHUNK_SIZE):
+        if not reader.feed(chunk):
+            print(f"Skipping {url}: body larger than {http_client.MAX_BYTES} bytes")
+            return None, ERROR_TOO_LARGE
+    return reader.finish(), None
+
+async def fetch_async(session, url, retries=3, cache_redirects=False):
+    """
+    Async counterpart of http_client.fetch. Returns a FetchResult.
+    The SQLite and raw cache work runs in the loop's executor, so a slow
+    commit never stalls the requests in flight.
+    """
+    loop = asyncio.get_running_loop()
+    if raw_cache.MODE == 'replay':
+        return await loop.run_in_executor(None, replay, url)
+
+    redirects = http_cache.get_redirect_cache() if cache_redirects else None
+    canonical = await loop.run_in_executor(None, redirects.get, url) if redirects else None
+    result = None
+    if canonical:
+        result = await _fetch_async(session, canonical, retries)
+        if result.error != ERROR_NOT_FOUND:
+            result.url = url
+        else:
+            await loop.run_in_executor(None, redirects.delete, url)
+            result = None
+
+    if result is None:
+        result = await _fetch_async(session, url, retries)
+        if redirects and result.ok and result.final_url != url:
+            await loop.run_in_executor(None, redirects.set, url, result.final_url)
+
+    if raw_cache.MODE == 'store' and result.ok:
+        await loop.run_in_executor(None, raw_cache.get_raw_cache().put, url, result.final_url, result.text)
+    return result
+
+async def _fetch_async(session, url, retries):
+    host = get_host(url)
+    limiter = rate_limiter.get_limiter(host)
+    breaker = circuit_breaker.get_breaker(host)
+    started_total = time.monotonic()
+    result = FetchResult(url)
+
+    for attempt in range(retries):
+        await breaker.before_request_async()
+        await limiter.acquire_async()
+        started = time.monotonic()
+        status, retry_after, error = None, None, None
+        try:
+            async with session.get(url) as response:
+                status = response.status
+                retry_after = response.headers.get('Retry-After')
+                error = classify_status(status)
+                result = FetchResult(url, status=status, final_url=str(response.url), error=error,
+                                     history=[str(r.url) for r in response.history])
+                if status == 200:
+                    result.text, result.error = await _read_body(response, url)
+        except Exception as e:
+            # print(f"Request error for {url}: {e}")
+            error = classify_exception(e)
+            result = FetchResult(url, error=error)
+        finally:
+            limiter.release(status, time.monotonic() - started, retry_after, error == ERROR_TIMEOUT)
+            if error in HOST_FAILURE_ERRORS:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+        result.attempts = attempt + 1
+        if not result.retryable or attempt == retries - 1:
+            break
+        await asyncio.sleep(backoff_delay(error, attempt))
+
+    result.elapsed = time.monotonic() - started_total
+    return result
+
+async def _worker(session, queue, url_template, parse_html, on_page, cache_redirects):
+    while True:
+        page_id = await queue.get()
+        data = None
+        failed = False
+        missing = False
+        try:
+            url = url_template.format(page_id)
+            result = await fetch_async(session, url, cache_redirects=cache_redirects)
+            if result.ok:
+                # Short links are stored under the canonical URL they resolve to
+                link = result.final_url if cache_redirects else url
+                # Parsed off the event loop when a parse pool is configured
+                data = await parse_pool.parse_async(asyncio.get_running_loop(), parse_html, result.text, page_id, link)
+                # Some parsers return a marker string (e.g. Kayhan's "404") instead of a dict
+                if isinstance(data, dict):
+                    print(f"Extracted: {(data.get('Title') or 'No Title')[:30]}")
+                else:
+                    missing = data == "404"
+                    data = None
+            else:
+                failed = result.transient
+                missing = result.error == ERROR_NOT_FOUND
+        except Exception as e:
+            print(f"Page {page_id}: Error - {e}")
+            failed = True
+        finally:
+            # on_page hands results to the sink and checkpoint, which may wait for the
+            # writer thread: run it in the executor so only this worker waits
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, on_page, page_id, data, failed, missing)
+            finally:
+                queue.task_done()
+
+async def _run_id_sweep(url_template, parse_html, page_ids, concurrency, per_host, cache_redirects, on_page):
+    # Bounded queue so a huge ID range does not become a huge list of pending tasks
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    timeout = aiohttp.ClientTimeout(sock_connect=TIMEOUT[0], sock_read=TIMEOUT[1])
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+        workers = [
+            asyncio.create_task(_worker(session, queue, url_template, parse_html, on_page, cache_redirects))
+            for _ in range(concurrency)
+        ]
+        for page_id in page_ids:
+            # None means the ID source waits for outcomes of pages in flight
+            if page_id is None:
+                await asyncio.sleep(0.1)
+                continue
+            await queue.put(page_id)
+        await queue.join()
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+def run_id_sweep(url_template, parse_html, page_ids, concurrency=CONCURRENCY, per_host=PER_HOST_LIMIT,
+                 cache_redirects=False, on_page=None):
+    """
+    Fetches url_template.format(id) for every id and feeds the HTML to parse_html(html, id, url).
+    If on_page is given it is called as on_page(id, record_or_None, failed, missing) for
+    every id, where failed means a transient fetch error and missing a 404. Otherwise
+    the parsed records are returned.
+    page_ids may yield None to pause until more pages have finished.
+    Use cache_redirects=True for short link templates (see http_client.fetch).
+    """
+    if not HAS_AIOHTTP:
+        raise RuntimeError("aiohttp is not installed. Install it or use --engine threads.")
+    results = []
+    if on_page is None:
+        on_page = lambda page_id, data, failed, missing: data and results.append(data)
+    asyncio.run(_run_id_sweep(url_template, parse_html, page_ids, concurrency, per_host, cache_redirects, on_page))
+    return results
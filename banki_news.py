@@ -1,59 +1,13 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
-import jdatetime
-import re
 
-COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
-
-MONTH_MAPPING = {
-    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
-    "تیر": 4, "مرداد": 5, "شهریور": 6,
-    "مهر": 7, "آبان": 8, "آذر": 9,
-    "دی": 10, "بهمن": 11, "اسفند": 12
-}
+import persian_date
+import soup_factory
 
-def convert_to_gregorian(persian_date_str):
-    try:
-        # Example: "شنبه ۲۲ آذر ۱۴۰۴ ساعت ۱۳:۱۹"
-        # Remove day name if present
-        parts = persian_date_str.split()
-        
-        # Look for day, month, year
-        day, month, year, time_str = None, None, None, None
-        
-        for i, part in enumerate(parts):
-            if part in MONTH_MAPPING:
-                month = MONTH_MAPPING[part]
-                if i > 0 and parts[i-1].isdigit():
-                    day = int(parts[i-1])
-                if i + 1 < len(parts) and parts[i+1].isdigit():
-                    year = int(parts[i+1])
-                break
-        
-        # If not found with simple logic, try regex
-        if not (day and month and year):
-            match = re.search(r'(\d{1,2})\s+([آ-ی]+)\s+(\d{4})', persian_date_str)
-            if match:
-                day = int(match.group(1))
-                month_name = match.group(2)
-                year = int(match.group(3))
-                month = MONTH_MAPPING.get(month_name)
+COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
 
-        if day and month and year:
-            # Handle time
-            hour, minute = 0, 0
-            time_match = re.search(r'(\d{1,2}):(\d{1,2})', persian_date_str)
-            if time_match:
-                hour = int(time_match.group(1))
-                minute = int(time_match.group(2))
-                
-            g_date = jdatetime.date(year, month, day).togregorian()
-            return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
-            
-    except Exception as e:
-        # print(f"Date conversion error: {e}")
-        pass
-    return None
+# Parts of an article page parse_html reads
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['h1'], classes=['news_image'], ids=['docDiv3Date', 'docDivLead1', 'doctextarea'])
 
 def parse_html(html_content, page_id, url):
     """
@@ -61,7 +15,7 @@ def parse_html(html_content, page_id, url):
     Extracts text from <div id="doctextarea">.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content, ARTICLE_REGIONS, fast=True)
         
         # Initialize data dictionary
         data = {col: None for col in COLUMNS}
@@ -84,7 +38,7 @@ def parse_html(html_content, page_id, url):
         if time_div:
             data['Time'] = time_div.get_text(strip=True)
             if data['Time']:
-                data['Gregorian_Date'] = convert_to_gregorian(data['Time'])
+                data['Gregorian_Date'] = persian_date.to_gregorian_str(data['Time'])
 
         # 3. Extract Description
         # User snippet: <div id="docDivLead1"><div id="docDivLead3"><div>...</div></div></div>
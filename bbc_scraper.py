@@ -1,8 +1,12 @@
-from bs4 import BeautifulSoup
 import re
 
+import soup_factory
+
+# List and article pages are only read inside <main>
+MAIN_REGIONS = soup_factory.Regions(tags=['main'])
+
 def parse_list_page(html):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, MAIN_REGIONS, fast=True)
     items = []
     
     main_content = soup.find("main")
@@ -49,7 +53,7 @@ def parse_list_page(html):
     return items
 
 def parse_article_page(html, url):
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, MAIN_REGIONS, fast=True)
     details = {}
     
     main_content = soup.find("main")
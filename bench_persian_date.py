@@ -0,0 +1,83 @@
+import random
+import re
+import time
+from datetime import datetime
+
+import jdatetime
+import pandas as pd
+
+import persian_date
+
+MONTH_MAPPING = dict(persian_date.MONTHS)
+
+def legacy_convert(persian_date_str):
+    # The per-module converter the site scrapers used to carry (hamshahri version)
+    try:
+        translation_table = str.maketrans("۰۱۲۳۴۵۶۷۸۹", "0123456789")
+        normalized_date = persian_date_str.translate(translation_table)
+        date_match = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', normalized_date)
+        if date_match:
+            year, month, day = (int(g) for g in date_match.groups())
+        else:
+            parts = re.split(r'\s+|[-]', normalized_date)
+            day, month, year = None, None, None
+            for i, part in enumerate(parts):
+                if part in MONTH_MAPPING:
+                    month = MONTH_MAPPING[part]
+                    if i > 0 and parts[i-1].isdigit():
+                        day = int(parts[i-1])
+                    if i + 1 < len(parts) and parts[i+1].isdigit():
+                        year = int(parts[i+1])
+                    break
+            if not (day and month and year):
+                return None
+        hour, minute = 0, 0
+        time_match = re.search(r'(\d{1,2}):(\d{1,2})', normalized_date)
+        if time_match:
+            hour, minute = int(time_match.group(1)), int(time_match.group(2))
+        g_date = jdatetime.date(year, month, day).togregorian()
+        return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return None
+
+def uncached_convert(text):
+    g_date = persian_date.to_gregorian.__wrapped__(text)
+    return g_date.strftime(persian_date.FORMAT) if g_date else None
+
+def make_dates(count, distinct):
+    """
+    count date strings drawn from distinct values, the way a crawl sees
+    the same few days over and over.
+    """
+    digits = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+    months = list(persian_date.MONTHS)
+    pool = []
+    for _ in range(distinct):
+        text = f"{random.randint(1, 28)} {random.choice(months)} {random.randint(1395, 1404)} - " \
+               f"{random.randint(0, 23):02d}:{random.randint(0, 59):02d}"
+        pool.append(text.translate(digits))
+    return [random.choice(pool) for _ in range(count)]
+
+def bench(name, func, dates):
+    start = time.perf_counter()
+    for text in dates:
+        func(text)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34} {elapsed * 1000:8.1f} ms  ({elapsed / len(dates) * 1e6:.2f} us/date)")
+
+if __name__ == "__main__":
+    random.seed(1)
+    for distinct in (50, 5000):
+        dates = make_dates(100000, distinct)
+        print(f"100000 dates, {distinct} distinct:")
+        bench("legacy per-module converter", legacy_convert, dates)
+        bench("persian_date, no cache", uncached_convert, dates)
+        persian_date.to_gregorian.cache_clear()
+        persian_date.to_gregorian_str.cache_clear()
+        bench("persian_date.to_gregorian_str", persian_date.to_gregorian_str, dates)
+        column = pd.Series(dates)
+        start = time.perf_counter()
+        persian_date.to_gregorian_series(column)
+        elapsed = time.perf_counter() - start
+        print(f"{'persian_date.to_gregorian_series':<34} {elapsed * 1000:8.1f} ms  (whole column)")
+        print()
@@ -0,0 +1,191 @@
+import bisect
+import json
+import os
+import threading
+
+import http_cache
+import pipeline
+
+# Completed pages between two flushes of results + checkpoint (scraper.py --flush-every)
+FLUSH_EVERY = 500
+
+class RangeSet:
+    """
+    Set of IDs kept as sorted, non overlapping [first, last] ranges.
+    Not thread safe; callers hold their own lock.
+    """
+
+    def __init__(self, ranges=None):
+        self.ranges = [list(r) for r in ranges or []]
+
+    def __contains__(self, page_id):
+        i = bisect.bisect_right(self.ranges, [page_id, float('inf')]) - 1
+        return i >= 0 and self.ranges[i][0] <= page_id <= self.ranges[i][1]
+
+    def __len__(self):
+        return sum(last - first + 1 for first, last in self.ranges)
+
+    def add(self, page_id):
+        self.add_range(page_id, page_id)
+
+    def add_range(self, first, last):
+        ranges = self.ranges
+        i = bisect.bisect_left(ranges, [first])
+        # Merge with every range that overlaps or touches [first, last]
+        if i > 0 and ranges[i - 1][1] >= first - 1:
+            i -= 1
+            first = ranges[i][0]
+            last = max(last, ranges[i][1])
+        j = i
+        while j < len(ranges) and ranges[j][0] <= last + 1:
+            last = max(last, ranges[j][1])
+            j += 1
+        ranges[i:j] = [[first, last]]
+
+    def last(self):
+        return self.ranges[-1][1] if self.ranges else None
+
+class Checkpoint:
+    """
+    Progress of an ID sweep: the ID ranges that are finished (saved, missing
+    or already known) and the IDs that failed and should be retried.
+    Stored as a small JSON file, replaced atomically on every save.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = RangeSet()
+        self.failed = set()
+        if resume and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.done = RangeSet(state.get('done'))
+            self.failed = set(state.get('failed', []))
+
+    def is_done(self, page_id):
+        with self.lock:
+            return page_id in self.done
+
+    def last_done(self):
+        """
+        Highest finished ID, or None for a new checkpoint.
+        """
+        with self.lock:
+            return self.done.last()
+
+    def mark_done(self, page_ids):
+        with self.lock:
+            for page_id in page_ids:
+                self.failed.discard(page_id)
+                self.done.add(page_id)
+
+    def mark_failed(self, page_ids):
+        with self.lock:
+            self.failed.update(page_ids)
+
+    def pending(self, start, count):
+        """
+        Yields the IDs of start..start+count-1 that still need fetching,
+        earlier failures first.
+        """
+        end = start + count
+        with self.lock:
+            failed = sorted(pid for pid in self.failed if start <= pid < end)
+        for page_id in failed:
+            yield page_id
+        for page_id in range(start, end):
+            if page_id not in self.failed and not self.is_done(page_id):
+                yield page_id
+
+    def save(self):
+        with self.lock:
+            write_json(self.path, {'done': self.done.ranges, 'failed': sorted(self.failed)})
+
+def write_json(path, state):
+    """
+    Writes state to path through a temp file, so a crash never leaves half a file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+class IdSweep:
+    """
+    Collects the outcome of every page of an ID sweep and flushes the
+    results and the checkpoint together every flush_every pages, so an
+    interrupted run loses at most one batch.
+    A page only counts as done once its result has been saved: save(results)
+    returns False when the sink failed, and then the pages with results are
+    kept as failed, to be retried with --resume. Flushes run on a background
+    writer thread, so neither the fetch threads nor the asyncio event loop
+    wait for TF-IDF and the sink.
+    """
+
+    def __init__(self, checkpoint, save, flush_every=None):
+        self.checkpoint = checkpoint
+        self.save = save
+        self.flush_every = flush_every or FLUSH_EVERY
+        self.lock = threading.Lock()
+        self.results = []
+        self.done = []
+        self.saved = []     # pages among done whose result is in results
+        self.failed = []
+        self.writer = pipeline.BatchWriter(self._write, batch_size=1)
+
+    def record(self, page_id, data, failed=False):
+        with self.lock:
+            if failed:
+                self.failed.append(page_id)
+            else:
+                self.done.append(page_id)
+                if data:
+                    self.results.append(data)
+                    self.saved.append(page_id)
+            if len(self.done) + len(self.failed) < self.flush_every:
+                return
+            flush = self._take()
+        self.writer.add(flush)
+
+    def _take(self):
+        flush = (self.results, self.done, self.saved, self.failed)
+        self.results, self.done, self.saved, self.failed = [], [], [], []
+        return flush
+
+    def _write(self, batch):
+        for results, done, saved, failed in batch:
+            if self.save(results) is False:
+                # Nothing of this batch reached the sink: retry its articles next time
+                unsaved = set(saved)
+                done = [page_id for page_id in done if page_id not in unsaved]
+                failed = failed + saved
+            self.checkpoint.mark_done(done)
+            self.checkpoint.mark_failed(failed)
+            self.checkpoint.save()
+
+    def close(self):
+        with self.lock:
+            flush = self._take()
+        self.writer.add(flush)
+        self.writer.close()
+        if self.checkpoint.failed:
+            print(f"{len(self.checkpoint.failed)} pages failed. Run again with --resume to retry them.")
+
+def checkpoint_path(output):
+    """
+    Checkpoint file for an output name, e.g. hamshahri.xlsx -> <cache dir>/checkpoints/hamshahri.json
+    """
+    name = os.path.splitext(os.path.basename(output))[0]
+    return os.path.join(http_cache.CACHE_DIR, 'checkpoints', f"{name}.json")
+
+def open_sweep(output, save, resume=False):
+    return IdSweep(Checkpoint(checkpoint_path(output), resume=resume), save)
+
+def configure(flush_every=None):
+    global FLUSH_EVERY
+    if flush_every:
+        FLUSH_EVERY = flush_every
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+# Consecutive failures (timeouts, connection errors, 5xx, 429) that open the circuit
+FAILURE_THRESHOLD = 10
+# Pause before the first probe. Doubles after every failed probe, up to MAX_COOLDOWN.
+COOLDOWN = 30
+MAX_COOLDOWN = 600
+# How often paused workers check whether the host is back
+POLL_INTERVAL = 1.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+    While open, every request to the host waits instead of running into
+    timeouts. After the cooldown a single probe request is let through:
+    success closes the circuit, failure opens it again for a longer cooldown.
+    """
+
+    def __init__(self, host, threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+
+    def _admit(self):
+        """
+        Returns 0 if the request may go ahead, otherwise seconds to wait.
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return 0
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self.open_until:
+                    return min(self.open_until - now, POLL_INTERVAL)
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            # Half open: exactly one probe at a time
+            if self.probe_in_flight:
+                return POLL_INTERVAL
+            self.probe_in_flight = True
+            print(f"Circuit half-open for {self.host}: sending probe request")
+            return 0
+
+    def before_request(self):
+        while True:
+            wait = self._admit()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def before_request_async(self):
+        while True:
+            wait = self._admit()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CLOSED:
+                print(f"Circuit closed for {self.host}: host is responding again")
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self.probe_in_flight = False
+        print(f"Circuit open for {self.host}: {self.failures} consecutive failures, pausing for {self.cooldown}s")
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(host):
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+    return breaker
@@ -0,0 +1,176 @@
+import gzip
+import os
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+from urllib.request import url2pathname
+
+import http_client
+
+# Nested sitemap indexes deeper than this are not followed
+MAX_DEPTH = 3
+
+class Entry:
+    """
+    One URL found in a sitemap or feed. lastmod is a naive UTC datetime or None.
+    """
+
+    def __init__(self, url, lastmod=None, title=None):
+        self.url = url
+        self.lastmod = lastmod
+        self.title = title
+
+    def __repr__(self):
+        return f"Entry({self.url!r}, lastmod={self.lastmod})"
+
+def parse_date(value):
+    """
+    Parses W3C datetimes (sitemaps, Atom) and RFC 822 dates (RSS) into naive UTC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        date = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _child_text(elem, *path):
+    """
+    Text of a direct child of elem, or of a nested one with several names
+    (e.g. 'news', 'title' for <news:news><news:title>). Deeper elements with
+    the same name, like <image:title> or <image:loc>, are never picked up.
+    """
+    for child in elem:
+        if _local_name(child.tag) != path[0]:
+            continue
+        if len(path) > 1:
+            text = _child_text(child, *path[1:])
+        else:
+            text = child.text.strip() if child.text else None
+        if text:
+            return text
+    return None
+
+def is_local(source):
+    return not re.match(r'https?://', source)
+
+def resolve(source, location):
+    """
+    Resolves a child sitemap location against its parent (URL or local path).
+    """
+    if re.match(r'[a-z]+://', location):
+        return location
+    if is_local(source) and not source.startswith('file://'):
+        return os.path.join(os.path.dirname(source), location)
+    return urljoin(source, location)
+
+def open_source(source):
+    """
+    Opens a sitemap/feed as a binary stream: an http(s) URL (fetched through
+    http_client.fetch_document, so rate limits and --replay apply), a file://
+    URL or a local path. .gz files are unpacked on the fly.
+    """
+    if is_local(source):
+        path = url2pathname(urlsplit(source).path) if source.startswith('file://') else source
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    stream, result = http_client.fetch_document(source)
+    if stream is None:
+        raise IOError(f"could not fetch it ({result.error or result.status})")
+    return stream
+
+def iter_document(source):
+    """
+    Streams one sitemap, sitemap index, RSS or Atom document.
+    Yields ('sitemap', Entry) for child sitemaps and ('url', Entry) for pages.
+    """
+    stream = open_source(source)
+    try:
+        for _, elem in ET.iterparse(stream, events=('end',)):
+            name = _local_name(elem.tag)
+            if name == 'sitemap':
+                yield 'sitemap', Entry(_child_text(elem, 'loc'), parse_date(_child_text(elem, 'lastmod')))
+            elif name == 'url':
+                # Google news sitemaps carry the publication date and title
+                lastmod = _child_text(elem, 'lastmod') or _child_text(elem, 'news', 'publication_date')
+                yield 'url', Entry(_child_text(elem, 'loc'), parse_date(lastmod), _child_text(elem, 'news', 'title'))
+            elif name == 'item':
+                lastmod = _child_text(elem, 'pubDate') or _child_text(elem, 'date')
+                yield 'url', Entry(_child_text(elem, 'link'), parse_date(lastmod), _child_text(elem, 'title'))
+            elif name == 'entry':
+                link = None
+                for child in elem:
+                    if _local_name(child.tag) == 'link' and child.get('rel', 'alternate') == 'alternate':
+                        link = child.get('href')
+                        break
+                lastmod = _child_text(elem, 'updated') or _child_text(elem, 'published')
+                yield 'url', Entry(link, parse_date(lastmod), _child_text(elem, 'title'))
+            else:
+                continue
+            # Drop the finished element so memory stays flat on huge sitemaps
+            elem.clear()
+    finally:
+        stream.close()
+
+def iter_entries(source, since=None, depth=0):
+    """
+    Yields every page Entry of a sitemap or feed, following nested sitemap
+    indexes. With since, pages and child sitemaps last modified before it are skipped.
+    """
+    try:
+        for kind, entry in iter_document(source):
+            if not entry.url:
+                continue
+            if since and entry.lastmod and entry.lastmod < since:
+                continue
+            if kind == 'sitemap':
+                if depth < MAX_DEPTH:
+                    yield from iter_entries(resolve(source, entry.url), since, depth + 1)
+            else:
+                yield entry
+    except Exception as e:
+        print(f"Error reading {source}: {e}")
+
+def sitemaps_from_robots(base_url):
+    """
+    Returns the sitemaps announced in robots.txt, or [base_url/sitemap.xml].
+    """
+    robots_url = urljoin(base_url, '/robots.txt')
+    html, status = http_client.fetch_url(robots_url)
+    sitemaps = []
+    if html:
+        for line in html.splitlines():
+            if line.lower().startswith('sitemap:'):
+                sitemaps.append(line.split(':', 1)[1].strip())
+    return sitemaps or [urljoin(base_url, '/sitemap.xml')]
+
+def discover(sources, since=None, url_pattern=None):
+    """
+    Streams the unique page entries of all sources (sitemaps, indexes, feeds,
+    local files), optionally only those whose URL matches url_pattern.
+    """
+    pattern = re.compile(url_pattern) if url_pattern else None
+    seen = set()
+    for source in sources:
+        print(f"Reading {source}")
+        for entry in iter_entries(source, since):
+            if entry.url in seen:
+                continue
+            if pattern and not pattern.search(entry.url):
+                continue
+            seen.add(entry.url)
+            yield entry
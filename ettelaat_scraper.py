@@ -1,60 +1,18 @@
-from bs4 import BeautifulSoup
-import jdatetime
-import re
-from datetime import datetime
+import persian_date
+import soup_factory
 
-MONTH_MAPPING = {
-    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
-    "تیر": 4, "مرداد": 5, "شهریور": 6,
-    "مهر": 7, "آبان": 8, "آذر": 9,
-    "دی": 10, "بهمن": 11, "اسفند": 12
-}
-
-def convert_to_gregorian(persian_date_str):
-    try:
-        # Normalize digits
-        persian_digits = "۰۱۲۳۴۵۶۷۸۹"
-        english_digits = "0123456789"
-        translation_table = str.maketrans(persian_digits, english_digits)
-        normalized_date = persian_date_str.translate(translation_table)
-        
-        # Check for YYYY/MM/DD format
-        date_match = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', normalized_date)
-        if date_match:
-            year = int(date_match.group(1))
-            month = int(date_match.group(2))
-            day = int(date_match.group(3))
-            
-            g_date = jdatetime.date(year, month, day).togregorian()
-            return datetime(g_date.year, g_date.month, g_date.day).strftime("%Y-%m-%d %H:%M:%S")
-
-        # Fallback to text based month
-        parts = persian_date_str.split()
-        day, month, year = None, None, None
-        
-        for i, part in enumerate(parts):
-            if part in MONTH_MAPPING:
-                month = MONTH_MAPPING[part]
-                if i > 0 and parts[i-1].isdigit():
-                    day = int(parts[i-1])
-                if i + 1 < len(parts) and parts[i+1].isdigit():
-                    year = int(parts[i+1])
-                break
-        
-        if day and month and year:
-             g_date = jdatetime.date(year, month, day).togregorian()
-             return datetime(g_date.year, g_date.month, g_date.day).strftime("%Y-%m-%d %H:%M:%S")
-            
-    except Exception as e:
-        pass
-    return None
+# Parts of the archive and article pages the parsers read
+ARCHIVE_REGIONS = soup_factory.Regions(classes=['news'])
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['article', 'h1', 'time'],
+    classes=['breadcrumb-item', 'body', 'item-text', 'item-title', 'item-date', 'news-date'])
 
 def parse_archive_page(html_content):
     """
     Parses the Ettelaat archive page.
     Returns: List of dictionaries containing item summary (Link, Title, etc.)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = soup_factory.make_soup(html_content, ARCHIVE_REGIONS, fast=True)
     news_items = soup.select("li.news")
     results = []
 
@@ -83,7 +41,7 @@ def parse_archive_page(html_content):
             
             gregorian_date = None
             if news_time:
-                gregorian_date = convert_to_gregorian(news_time)
+                gregorian_date = persian_date.to_gregorian_str(news_time)
 
             if link:
                  if link.startswith('/'):
@@ -105,10 +63,10 @@ def parse_archive_page(html_content):
 def parse_article_page(html_content, url):
     """
     Parses the Ettelaat article page.
-    Returns: dictionary with Full_Text and Category (Subject)
+    Returns: dictionary with Title, Time, Gregorian_Date, Full_Text and Category (Subject)
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content, ARTICLE_REGIONS, fast=True)
         
         # Extract Category
         category = ""
@@ -124,6 +82,17 @@ def parse_article_page(html_content, url):
         if cat_element:
             category = cat_element.get_text(strip=True)
 
+        # Title and publication time, for articles that do not come from an archive page
+        title_element = soup.select_one("h1") or soup.select_one(".item-title")
+        title = title_element.get_text(strip=True) if title_element else None
+
+        time_element = soup.select_one(".item-date, .news-date, time")
+        news_time = time_element.get_text(strip=True) if time_element else None
+        gregorian_date = persian_date.to_gregorian_str(news_time) if news_time else None
+        if not gregorian_date and time_element and time_element.get('datetime'):
+            # 2024-01-14T19:13:00Z -> 2024-01-14 19:13:00
+            gregorian_date = time_element.get('datetime')[:19].replace('T', ' ')
+
         # Content Extraction
         content_div = soup.select_one("div.body")
         if not content_div:
@@ -136,6 +105,9 @@ def parse_article_page(html_content, url):
             full_text = content_div.get_text(separator="\n", strip=True)
         
         return {
+            "Title": title,
+            "Time": news_time,
+            "Gregorian_Date": gregorian_date,
             "Full_Text": full_text,
             "Subject": category
         }
@@ -1,14 +1,20 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 
+import soup_factory
+
 BASE_URL = "https://parsi.euronews.com"
 
+# Parts of an article page parse_html reads
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['h1', 'time'], classes=['c-article-media__img'],
+    class_contains=['article-standfirst', 'article-content'], attrs={'name': 'description'})
+
 def parse_html(html, page_id, url=None):
     """
     Parses the HTML content of a Euronews article.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, ARTICLE_REGIONS, fast=True)
 
     # Title
     title_tag = soup.find("h1")
@@ -1,14 +1,20 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+import soup_factory
+
 COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
 
+# Parts of an article page parse_html reads
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['h1', 'time'], ids=['echo_detail'],
+    classes=['body', 'news-body', 'breadcrumb_list', 'subtitle', 'lead', 'primary_files'])
+
 def parse_html(html_content, page_id, url):
     """
     Parses the raw HTML content for Fararu news.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content, ARTICLE_REGIONS, fast=True)
         
         # Initialize data dictionary
         data = {col: None for col in COLUMNS}
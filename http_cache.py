@@ -0,0 +1,189 @@
+import os
+import sqlite3
+import threading
+
+# Directory for all persistent fetch-layer state (scraper.py --cache-dir)
+CACHE_DIR = '.scraper_cache'
+# Send stored validators with conditional fetches (turned off by scraper.py --refresh)
+CONDITIONAL_GET = True
+# Runs in a row an article may fail before it stops holding back its list page's validators
+MAX_ITEM_FAILURES = 3
+
+class SqliteStore:
+    """
+    Base for small thread-safe tables kept in a SQLite file.
+    Every write is committed right away so the data survives a crash.
+    """
+    schema = None
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.schema:
+            self.conn.execute(self.schema)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class RedirectCache(SqliteStore):
+    """
+    Maps a URL that redirected (e.g. a tn.ai short link) to its final URL,
+    so later runs can request the canonical page directly.
+    """
+    schema = "CREATE TABLE IF NOT EXISTS redirects (url TEXT PRIMARY KEY, final_url TEXT NOT NULL)"
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute("SELECT final_url FROM redirects WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, url, final_url):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO redirects (url, final_url) VALUES (?, ?)", (url, final_url))
+
+    def delete(self, url):
+        with self.lock:
+            self.conn.execute("DELETE FROM redirects WHERE url = ?", (url,))
+
+class ValidatorStore(SqliteStore):
+    """
+    Remembers the ETag / Last-Modified validators of a URL for conditional GETs.
+    """
+    schema = "CREATE TABLE IF NOT EXISTS validators (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)"
+
+    def get(self, url):
+        """
+        Returns the conditional request headers for the URL (empty dict if unknown).
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM validators WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def set(self, url, etag, last_modified):
+        if not etag and not last_modified:
+            return
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO validators (url, etag, last_modified) VALUES (?, ?, ?)",
+                              (url, etag, last_modified))
+
+class FailedItemStore(SqliteStore):
+    """
+    Counts the runs in a row in which an article of a list page could not be
+    fetched or parsed.
+    """
+    schema = "CREATE TABLE IF NOT EXISTS failed_items (link TEXT PRIMARY KEY, failures INTEGER NOT NULL)"
+
+    def add_failure(self, link):
+        """
+        Counts one more failed run for link and returns the new count.
+        """
+        with self.lock:
+            self.conn.execute("INSERT INTO failed_items (link, failures) VALUES (?, 1) "
+                              "ON CONFLICT(link) DO UPDATE SET failures = failures + 1", (link,))
+            return self.conn.execute("SELECT failures FROM failed_items WHERE link = ?", (link,)).fetchone()[0]
+
+    def clear(self, links):
+        with self.lock:
+            self.conn.executemany("DELETE FROM failed_items WHERE link = ?", ((link,) for link in links))
+
+class PendingValidators:
+    """
+    Holds back the validators of the list pages fetched in a run. They are
+    stored by commit() only for pages whose items were all fetched and saved,
+    so a crash or a failed article never turns into a 304 that hides the
+    unsaved items of the page on the next run. An article that keeps failing
+    stops holding back its page after MAX_ITEM_FAILURES runs in a row.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+        # id(item) -> (page url, item, link); the item is kept so its id is not reused
+        self.items = {}
+        self.failed_items = []
+        self.failed = set()
+
+    def add(self, result, items, get_link):
+        """
+        Registers a fetched list page (a FetchResult) and the items taken from it;
+        get_link(item) returns the article link of an item.
+        """
+        with self.lock:
+            self.pages[result.url] = (result.etag, result.last_modified)
+            for item in items:
+                self.items[id(item)] = (result.url, item, get_link(item))
+
+    def item_failed(self, item):
+        with self.lock:
+            entry = self.items.get(id(item))
+            if entry and entry[1] is item:
+                self.failed_items.append((entry[0], entry[2]))
+
+    def discard(self):
+        """
+        Drops every page registered so far, e.g. after a batch of their items could not be saved.
+        """
+        with self.lock:
+            self.failed.update(self.pages)
+
+    def commit(self):
+        with self.lock:
+            pages, items, failed_items, blocked = self.pages, self.items, self.failed_items, set(self.failed)
+            self.pages, self.items, self.failed_items, self.failed = {}, {}, [], set()
+
+        failures = get_failed_item_store()
+        failed_links = set()
+        for url, link in failed_items:
+            failed_links.add(link)
+            count = failures.add_failure(link)
+            if count < MAX_ITEM_FAILURES:
+                blocked.add(url)
+            else:
+                print(f"  {link} failed in {count} runs in a row; no longer re-checking {url} for it.")
+        failures.clear([link for _, _, link in items.values() if link not in failed_links])
+
+        store = get_validator_store()
+        for url, (etag, last_modified) in pages.items():
+            if url not in blocked:
+                store.set(url, etag, last_modified)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _get_store(cls, filename):
+    path = os.path.join(CACHE_DIR, filename)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = cls(path)
+            _stores[path] = store
+    return store
+
+def get_redirect_cache():
+    return _get_store(RedirectCache, 'redirects.sqlite')
+
+def get_validator_store():
+    return _get_store(ValidatorStore, 'validators.sqlite')
+
+def get_failed_item_store():
+    return _get_store(FailedItemStore, 'failed_items.sqlite')
+
+def configure(cache_dir=None, conditional=None):
+    global CACHE_DIR, CONDITIONAL_GET
+    if cache_dir:
+        CACHE_DIR = cache_dir
+    if conditional is not None:
+        CONDITIONAL_GET = conditional
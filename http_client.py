@@ -0,0 +1,462 @@
+import codecs
+import gzip
+import io
+import random
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+import cloudscraper
+
+import rate_limiter
+import circuit_breaker
+import http_cache
+import raw_cache
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# (connect, read) timeouts. A dead host fails on connect quickly instead of
+# waiting for the full read timeout.
+TIMEOUT = (10, 30)
+
+# Error classes reported in FetchResult.error
+ERROR_DNS = 'dns'                  # host name does not resolve
+ERROR_CONNECTION = 'connection'    # refused / reset / TLS failure
+ERROR_TIMEOUT = 'timeout'
+ERROR_THROTTLED = 'throttled'      # 429 / 503
+ERROR_SERVER = 'server_error'      # other 5xx
+ERROR_NOT_FOUND = 'not_found'      # 404 / 410
+ERROR_CLIENT = 'client_error'      # other 4xx
+ERROR_OTHER = 'error'
+ERROR_NOT_CACHED = 'not_cached'    # replay mode: page is not in the raw cache
+ERROR_CONTENT_TYPE = 'bad_content_type'  # e.g. a PDF or video under an article URL
+ERROR_TOO_LARGE = 'too_large'      # body larger than MAX_BYTES
+
+# Backoff (base, cap) in seconds per retryable error class. The actual delay is
+# "full jitter": random between 0 and min(cap, base * 2 ** attempt).
+BACKOFF = {
+    ERROR_CONNECTION: (1, 10),
+    ERROR_TIMEOUT: (2, 20),
+    ERROR_THROTTLED: (5, 60),
+    ERROR_SERVER: (2, 30),
+    ERROR_OTHER: (1, 10),
+}
+# DNS failures, 404s and other 4xx will not get better by retrying right away
+
+# Errors that say the host itself is in trouble. These feed the circuit breaker;
+# a 404 still proves the host is alive.
+HOST_FAILURE_ERRORS = (ERROR_DNS, ERROR_CONNECTION, ERROR_TIMEOUT, ERROR_THROTTLED, ERROR_SERVER)
+
+# Bodies are streamed and decoded chunk by chunk; anything larger than
+# MAX_BYTES is abandoned so a single huge page cannot blow up worker memory.
+MAX_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Non-200 bodies up to this size are read and dropped so the connection can be reused
+DRAIN_LIMIT = 256 * 1024
+ALLOWED_CONTENT_TYPES = (
+    'text/html', 'application/xhtml+xml', 'text/plain',
+    'text/xml', 'application/xml', 'application/rss+xml', 'application/atom+xml',
+)
+
+_charset_header_re = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_charset_meta_re = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+# Max keep-alive connections per host. scraper.py keeps this equal to MAX_WORKERS
+# so every worker thread can hold its own connection without waiting.
+POOL_SIZE = 5
+
+# One session per host. requests.Session (and the urllib3 pool behind it) is safe
+# to share between threads, so all workers of a run reuse the same connections.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# cloudscraper sessions are kept per thread: solving the Cloudflare challenge is
+# expensive, and the clearance cookie it earns stays valid for many requests.
+_local = threading.local()
+
+def get_host(url):
+    return urlsplit(url).netloc.lower()
+
+def configure(pool_size=None, max_bytes=None):
+    """
+    Updates the connection pool settings and the response size cap.
+    Existing sessions are closed so the new size applies to the next request.
+    """
+    global POOL_SIZE, MAX_BYTES
+    if pool_size:
+        POOL_SIZE = pool_size
+    if max_bytes:
+        MAX_BYTES = max_bytes
+    close_sessions()
+
+def _create_session():
+    session = requests.Session()
+    # pool_connections > 1 so redirects to another host (e.g. tn.ai -> tasnimnews.com)
+    # keep their own pool inside the same session.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(HEADERS)
+    return session
+
+def get_session(url):
+    """
+    Returns the shared keep-alive session for the host of the given URL.
+    """
+    host = get_host(url)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _create_session()
+            _sessions[host] = session
+    return session
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def _clearance_expired(scraper):
+    for cookie in scraper.cookies:
+        if cookie.name == 'cf_clearance' and cookie.is_expired():
+            return True
+    return False
+
+def get_cloudscraper():
+    """
+    Returns this thread's cloudscraper session.
+    A new one is created only when the Cloudflare clearance cookie has expired.
+    """
+    scraper = getattr(_local, 'cloudscraper', None)
+    if scraper is None or _clearance_expired(scraper):
+        if scraper is not None:
+            scraper.close()
+        scraper = cloudscraper.create_scraper(
+             browser={'browser': 'chrome', 'platform': 'windows', 'mobile': False}
+        )
+        _local.cloudscraper = scraper
+    return scraper
+
+class FetchResult:
+    """
+    Outcome of fetch(): body and metadata on success, error class on failure.
+    """
+
+    def __init__(self, url, text=None, status=0, final_url=None, elapsed=0.0, error=None, attempts=0, history=None):
+        self.url = url
+        self.text = text
+        self.status = status
+        self.final_url = final_url or url
+        # URLs of the redirect hops before final_url
+        self.history = history or []
+        # Validators of a 200 response, for conditional requests
+        self.etag = None
+        self.last_modified = None
+        # Spooled binary body of a fetch_document() response
+        self.body = None
+        self.elapsed = elapsed
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self):
+        return self.text is not None and self.error is None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    @property
+    def retryable(self):
+        return self.error in BACKOFF
+
+    @property
+    def transient(self):
+        """
+        True if the page could not be fetched for reasons worth another try in a
+        later run (network trouble, throttling, server errors), not because it is missing.
+        """
+        return self.error in HOST_FAILURE_ERRORS or self.error == ERROR_OTHER
+
+    def __repr__(self):
+        return f"FetchResult({self.url!r}, status={self.status}, error={self.error!r}, elapsed={self.elapsed:.2f})"
+
+def classify_status(status):
+    if status in (200, 304):
+        return None
+    if status in (404, 410):
+        return ERROR_NOT_FOUND
+    if status in rate_limiter.THROTTLE_STATUSES:
+        return ERROR_THROTTLED
+    if 500 <= status < 600:
+        return ERROR_SERVER
+    if 400 <= status < 500:
+        return ERROR_CLIENT
+    return ERROR_OTHER
+
+def is_dns_error(e):
+    text = str(e)
+    return any(marker in text for marker in (
+        'NameResolutionError', 'Name or service not known', 'getaddrinfo failed',
+        'nodename nor servname', 'Temporary failure in name resolution',
+    ))
+
+def classify_exception(e):
+    if isinstance(e, requests.Timeout):
+        return ERROR_TIMEOUT
+    if isinstance(e, requests.ConnectionError):
+        return ERROR_DNS if is_dns_error(e) else ERROR_CONNECTION
+    return ERROR_OTHER
+
+def is_allowed_content_type(content_type):
+    # A missing header is given the benefit of the doubt
+    if not content_type:
+        return True
+    mime = content_type.split(';')[0].strip().lower()
+    return mime in ALLOWED_CONTENT_TYPES
+
+class BodyReader:
+    """
+    Decodes a response body chunk by chunk with an incremental decoder.
+    The charset comes from the Content-Type header, else from a <meta> tag in
+    the first chunk, else UTF-8. feed() returns False once MAX_BYTES is exceeded.
+    """
+
+    def __init__(self, content_type, max_bytes=None):
+        match = _charset_header_re.search(content_type or '')
+        self.charset = match.group(1) if match else None
+        self.max_bytes = max_bytes or MAX_BYTES
+        self.size = 0
+        self.decoder = None
+        self.parts = []
+
+    def _create_decoder(self, first_chunk):
+        charset = self.charset
+        if not charset:
+            match = _charset_meta_re.search(first_chunk[:4096])
+            charset = match.group(1).decode('ascii', 'ignore') if match else 'utf-8'
+        try:
+            return codecs.getincrementaldecoder(charset)(errors='replace')
+        except LookupError:
+            return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def feed(self, chunk):
+        if not chunk:
+            return True
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            return False
+        if self.decoder is None:
+            self.decoder = self._create_decoder(chunk)
+        self.parts.append(self.decoder.decode(chunk))
+        return True
+
+    def finish(self):
+        if self.decoder is not None:
+            self.parts.append(self.decoder.decode(b'', final=True))
+        return ''.join(self.parts)
+
+def _read_body(response, url):
+    """
+    Streams the body of a 200 response. Returns (text, error).
+    """
+    content_type = response.headers.get('Content-Type')
+    if not is_allowed_content_type(content_type):
+        return None, ERROR_CONTENT_TYPE
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BYTES:
+        return None, ERROR_TOO_LARGE
+
+    reader = BodyReader(content_type)
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if not reader.feed(chunk):
+            print(f"Skipping {url}: body larger than {MAX_BYTES} bytes")
+            return None, ERROR_TOO_LARGE
+    return reader.finish(), None
+
+def _spool_body(response, url):
+    """
+    Copies the body of a 200 response to a temporary file (kept in memory while
+    small). Returns (file, error); the file is rewound.
+    """
+    content_length = response.headers.get('Content-Length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BYTES:
+        return None, ERROR_TOO_LARGE
+
+    spool = tempfile.SpooledTemporaryFile(max_size=MAX_BYTES // 4)
+    size = 0
+    for chunk in response.iter_content(CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_BYTES:
+            print(f"Skipping {url}: body larger than {MAX_BYTES} bytes")
+            spool.close()
+            return None, ERROR_TOO_LARGE
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, None
+
+def _drain(response):
+    drained = 0
+    for chunk in response.iter_content(CHUNK_SIZE):
+        drained += len(chunk)
+        if drained > DRAIN_LIMIT:
+            break
+
+def backoff_delay(error, attempt):
+    base, cap = BACKOFF.get(error, BACKOFF[ERROR_OTHER])
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def fetch(url, retries=3, use_cloudscraper=False, cache_redirects=False, conditional=False):
+    """
+    Fetches a URL with per-host rate limiting, circuit breaking and retries.
+    Returns a FetchResult; retries only errors listed in BACKOFF.
+
+    With cache_redirects=True the final URL of a redirecting URL (short links) is
+    stored persistently and requested directly on later calls.
+
+    With conditional=True the stored ETag / Last-Modified of the URL are sent
+    along; an unchanged page comes back as status 304 with no text. The new
+    validators (result.etag / result.last_modified) are not stored here: the
+    caller does that once the page is fully handled (http_cache.PendingValidators).
+
+    raw_cache.MODE decides whether pages are also written to the raw HTML cache
+    ('store') or served from it without touching the network ('replay').
+    """
+    if raw_cache.MODE == 'replay':
+        return replay(url)
+
+    if conditional and http_cache.CONDITIONAL_GET:
+        result = _fetch(url, retries, use_cloudscraper, http_cache.get_validator_store().get(url))
+    else:
+        result = _fetch_with_redirect_cache(url, retries, use_cloudscraper, cache_redirects)
+
+    if raw_cache.MODE == 'store' and result.ok:
+        raw_cache.get_raw_cache().put(url, result.final_url, result.text)
+    return result
+
+def fetch_document(url, retries=3):
+    """
+    Counterpart of fetch() for sitemaps and feeds, which are far larger than
+    an article and often gzipped. The body is spooled to a temporary file
+    instead of being decoded into a string, and a gzipped body is unpacked on
+    the fly. Rate limiting, circuit breaking, retries, MAX_BYTES and the raw
+    cache work as in fetch().
+    Returns (stream, result): a binary file object, or None if result has an error.
+    """
+    if raw_cache.MODE == 'replay':
+        result = replay(url)
+        return (io.BytesIO(result.text.encode('utf-8')) if result.ok else None), result
+
+    result = _fetch(url, retries, False, None, read_body=_spool_body)
+    stream = result.body
+    if stream is None:
+        return None, result
+    # A .gz file sent without Content-Encoding still needs unpacking
+    if stream.read(2) == b'\x1f\x8b':
+        stream.seek(0)
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    else:
+        stream.seek(0)
+
+    if raw_cache.MODE == 'store':
+        text = stream.read().decode('utf-8', errors='replace')
+        stream.close()
+        raw_cache.get_raw_cache().put(url, result.final_url, text)
+        stream = io.BytesIO(text.encode('utf-8'))
+    return stream, result
+
+def replay(url):
+    """
+    Serves a URL from the raw HTML cache.
+    """
+    cached = raw_cache.get_raw_cache().get(url)
+    if cached is None:
+        return FetchResult(url, error=ERROR_NOT_CACHED, attempts=1)
+    text, final_url = cached
+    result = FetchResult(url, status=200, final_url=final_url, attempts=1)
+    result.text = text
+    return result
+
+def _fetch_with_redirect_cache(url, retries, use_cloudscraper, cache_redirects):
+    redirects = http_cache.get_redirect_cache() if cache_redirects else None
+    canonical = redirects.get(url) if redirects else None
+    if canonical:
+        result = _fetch(canonical, retries, use_cloudscraper, None)
+        if result.error != ERROR_NOT_FOUND:
+            result.url = url
+            return result
+        # The canonical page is gone; forget it and go through the original URL again
+        redirects.delete(url)
+
+    result = _fetch(url, retries, use_cloudscraper, None)
+    if redirects and result.ok and result.final_url != url:
+        redirects.set(url, result.final_url)
+    return result
+
+def _fetch(url, retries, use_cloudscraper, headers, read_body=None):
+    host = get_host(url)
+    limiter = rate_limiter.get_limiter(host)
+    breaker = circuit_breaker.get_breaker(host)
+    started_total = time.monotonic()
+    result = FetchResult(url)
+
+    for attempt in range(retries):
+        breaker.before_request()
+        limiter.acquire()
+        started = time.monotonic()
+        status, retry_after, error = None, None, None
+        response = None
+        try:
+            if use_cloudscraper:
+                response = get_cloudscraper().get(url, headers=headers, timeout=TIMEOUT, stream=True)
+            else:
+                response = get_session(url).get(url, headers=headers, timeout=TIMEOUT, stream=True)
+            status = response.status_code
+            retry_after = response.headers.get('Retry-After')
+            error = classify_status(status)
+            result = FetchResult(url, status=status, final_url=response.url, error=error,
+                                 history=[r.url for r in response.history])
+            if status == 200 and read_body:
+                result.body, result.error = read_body(response, url)
+            elif status == 200:
+                result.text, result.error = _read_body(response, url)
+                result.etag = response.headers.get('ETag')
+                result.last_modified = response.headers.get('Last-Modified')
+            else:
+                _drain(response)
+        except Exception as e:
+            # print(f"Request error for {url}: {e}")
+            error = classify_exception(e)
+            result = FetchResult(url, error=error)
+        finally:
+            if response is not None:
+                response.close()
+            limiter.release(status, time.monotonic() - started, retry_after, error == ERROR_TIMEOUT)
+            if error in HOST_FAILURE_ERRORS:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+        result.attempts = attempt + 1
+        if not result.retryable or attempt == retries - 1:
+            break
+        time.sleep(backoff_delay(error, attempt))
+
+    result.elapsed = time.monotonic() - started_total
+    return result
+
+def fetch_url(url, retries=3, use_cloudscraper=False, cache_redirects=False, conditional=False):
+    """
+    Returns (html, status). html is None unless status is 200.
+    Use fetch() when the final URL or error details are needed.
+    """
+    result = fetch(url, retries=retries, use_cloudscraper=use_cloudscraper,
+                   cache_redirects=cache_redirects, conditional=conditional)
+    return result.text, result.status
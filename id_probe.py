@@ -0,0 +1,121 @@
+import math
+
+# Fewest IDs checked at each probe point. A point counts as live if any of
+# them is, so gaps of up to WINDOW - 1 missing IDs are not mistaken for the head.
+WINDOW = 20
+# On sparse sites (Mehr, Tasnim, ...) the window is widened so that a window
+# without a live ID happens by chance at most once in MISS_RISK, up to MAX_WINDOW
+MAX_WINDOW = 2000
+MISS_RISK = 1e-4
+# Live IDs sampled from the start before the window is chosen
+SAMPLE_HITS = 16
+
+class ProbeError(Exception):
+    """
+    Raised by is_live when an ID could not be checked (network trouble, throttling).
+    """
+
+def first_live(is_live, page_id, window):
+    """
+    Returns the first live ID in page_id .. page_id + window - 1, or None.
+    """
+    for pid in range(page_id, page_id + window):
+        if is_live(pid):
+            return pid
+    return None
+
+def window_for_density(density, minimum=None):
+    """
+    Smallest window that holds a live ID with probability 1 - MISS_RISK when
+    a density share of the IDs is live.
+    """
+    minimum = minimum or WINDOW
+    if density >= 1:
+        return minimum
+    if density <= 0:
+        return MAX_WINDOW
+    window = math.ceil(math.log(MISS_RISK) / math.log(1 - density))
+    return max(minimum, min(MAX_WINDOW, window))
+
+def sample_window(is_live, start, minimum, step=-1):
+    """
+    Walks from start (down with step=-1, up with step=1) until SAMPLE_HITS live
+    IDs are seen and sizes the window from their density. Returns
+    (highest live ID seen, window, dead_end), or None if no live ID turns up
+    within MAX_WINDOW IDs. dead_end is True when the walk stopped after
+    MAX_WINDOW dead IDs in a row.
+    """
+    highest = None
+    hits = 0
+    dead = 0
+    pid = start
+    while hits < SAMPLE_HITS and dead < MAX_WINDOW and pid >= 1:
+        if is_live(pid):
+            highest = pid if highest is None else max(highest, pid)
+            hits += 1
+            dead = 0
+        else:
+            dead += 1
+        pid += step
+    if highest is None:
+        return None
+    checked = abs(pid - start)
+    # Two standard deviations below the sampled density: a small sample easily
+    # overstates it, and a window that is too narrow finds a false head
+    density = max(hits - 2 * math.sqrt(hits), 1) / checked
+    return highest, window_for_density(density, minimum), dead >= MAX_WINDOW
+
+def find_latest_id(is_live, start, window=None):
+    """
+    Finds the highest live ID, starting from a known (or guessed) ID.
+    Samples the density of live IDs below start (those are published already,
+    so an incremental run with few new articles stays cheap) to choose the
+    window, steps forward exponentially until a whole window is dead, then
+    binary searches between the last live ID and that window.
+    is_live(page_id) must return True for existing articles and may raise ProbeError.
+    Returns None if there is no live ID near start.
+    """
+    minimum = window or WINDOW
+    sampled = sample_window(is_live, start, minimum)
+    if sampled is None:
+        # start is a guess below the first article: sample upwards instead
+        sampled = sample_window(is_live, start + 1, minimum, step=1)
+        if sampled is None:
+            return None
+        if sampled[2]:
+            # Nothing for MAX_WINDOW IDs above the last hit: that is the head
+            return sampled[0]
+    lo, window, _ = sampled
+    print(f"  Probe window: {window} IDs")
+
+    # Exponential phase: find a dead window above the head
+    step = window
+    while True:
+        hit = first_live(is_live, lo + step, window)
+        if hit is None:
+            hi = lo + step
+            break
+        print(f"  ID {hit} is live")
+        lo = hit
+        step *= 2
+
+    # Binary search: lo is live, the window at hi is dead
+    while hi - lo > window:
+        mid = (lo + hi) // 2
+        hit = first_live(is_live, mid, window)
+        if hit is not None:
+            print(f"  ID {hit} is live")
+            lo = hit
+        else:
+            hi = mid
+
+    # The few IDs between lo and hi were not all checked
+    for pid in range(hi - 1, lo, -1):
+        if is_live(pid):
+            return pid
+    return lo
+
+def configure(window=None):
+    global WINDOW
+    if window:
+        WINDOW = window
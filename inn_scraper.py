@@ -1,77 +1,19 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
-import jdatetime
-import re
 
-COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
-
-MONTH_MAPPING = {
-    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
-    "تیر": 4, "مرداد": 5, "شهریور": 6,
-    "مهر": 7, "آبان": 8, "آذر": 9,
-    "دی": 10, "بهمن": 11, "اسفند": 12
-}
+import persian_date
+import soup_factory
 
-def convert_to_gregorian(persian_date_str):
-    try:
-        # Example: "۱۸:۱۸ - ۱۴۰۲/۱۱/۲۹"
-        # Need to handle this format specifically if it differs from Arman/Banki
-        
-        # Normalize digits
-        persian_digits = "۰۱۲۳۴۵۶۷۸۹"
-        english_digits = "0123456789"
-        translation_table = str.maketrans(persian_digits, english_digits)
-        normalized_date = persian_date_str.translate(translation_table)
-        
-        # Check for YYYY/MM/DD format
-        date_match = re.search(r'(\d{4})/(\d{1,2})/(\d{1,2})', normalized_date)
-        if date_match:
-            year = int(date_match.group(1))
-            month = int(date_match.group(2))
-            day = int(date_match.group(3))
-            
-            hour, minute = 0, 0
-            time_match = re.search(r'(\d{1,2}):(\d{1,2})', normalized_date)
-            if time_match:
-                hour = int(time_match.group(1))
-                minute = int(time_match.group(2))
-            
-            g_date = jdatetime.date(year, month, day).togregorian()
-            return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
+COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
 
-        # Fallback to text based month if format is different
-        parts = persian_date_str.split()
-        day, month, year = None, None, None
-        
-        for i, part in enumerate(parts):
-            if part in MONTH_MAPPING:
-                month = MONTH_MAPPING[part]
-                if i > 0 and parts[i-1].isdigit():
-                    day = int(parts[i-1])
-                if i + 1 < len(parts) and parts[i+1].isdigit():
-                    year = int(parts[i+1])
-                break
-        
-        if day and month and year:
-             hour, minute = 0, 0
-             time_match = re.search(r'(\d{1,2}):(\d{1,2})', persian_date_str)
-             if time_match:
-                 hour = int(time_match.group(1))
-                 minute = int(time_match.group(2))
-                 
-             g_date = jdatetime.date(year, month, day).togregorian()
-             return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
-            
-    except Exception as e:
-        pass
-    return None
+# Parts of an article page parse_html reads (every img: the image is matched by its alt text)
+ARTICLE_REGIONS = soup_factory.Regions(tags=['h1', 'img', 'time'], classes=['content', 'details'])
 
 def parse_html(html_content, page_id, url):
     """
     Parses the raw HTML content for inn.ir news.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content, ARTICLE_REGIONS, fast=True)
         
         # Initialize data dictionary
         data = {col: None for col in COLUMNS}
@@ -139,7 +81,7 @@ def parse_html(html_content, page_id, url):
                  data['Time'] = time_tag.get_text(strip=True)
                  
         if data['Time']:
-            data['Gregorian_Date'] = convert_to_gregorian(data['Time'])
+            data['Gregorian_Date'] = persian_date.to_gregorian_str(data['Time'])
 
         # Return data only if we found something useful (Title or Text)
         if data['Title'] or data['Full_Text']:
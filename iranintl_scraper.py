@@ -1,15 +1,20 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import jdatetime
 
+import soup_factory
+
 BASE_URL = "https://www.iranintl.com"
 
+# Parts of the article and list pages the parsers read
+ARTICLE_REGIONS = soup_factory.Regions(tags=['h1', 'article', 'time'])
+LIST_REGIONS = soup_factory.Regions(tags=['article'])
+
 def parse_article_page(html, url):
     """
     Parses the article page to extract full text and other details.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, ARTICLE_REGIONS, fast=True)
     
     # Title
     title_tag = soup.find(["h1"])
@@ -50,7 +55,7 @@ def parse_list_page(html):
     """
     Parses the list page to extract article metadata.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, LIST_REGIONS, fast=True)
     articles_html = soup.find_all("article")
     
     articles = []
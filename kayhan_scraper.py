@@ -1,61 +1,20 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
-import jdatetime
+
+import persian_date
+import soup_factory
 
 COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text']
 
-def convert_persian_to_gregorian(persian_date_str):
-    if not persian_date_str:
-        return ""
-    
-    # نگاشت اعداد فارسی به انگلیسی
-    persian_digits = "۰۱۲۳۴۵۶۷۸۹"
-    english_digits = "0123456789"
-    translation_table = str.maketrans(persian_digits, english_digits)
-    clean_str = persian_date_str.translate(translation_table)
-    
-    # نگاشت ماه‌ها
-    month_map = {
-        'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3,
-        'تیر': 4, 'مرداد': 5, 'شهریور': 6,
-        'مهر': 7, 'آبان': 8, 'آذر': 9,
-        'دی': 10, 'بهمن': 11, 'اسفند': 12
-    }
-    
-    try:
-        # نمونه فرمت: 13 مهر 1392 - 10:46
-        # جدا کردن ساعت و تاریخ
-        parts = clean_str.split('-')
-        date_part = parts[0].strip()
-        time_part = parts[1].strip() if len(parts) > 1 else "00:00"
-        
-        # پردازش بخش تاریخ
-        date_elements = date_part.split()
-        day = int(date_elements[0])
-        month_name = date_elements[1]
-        year = int(date_elements[2])
-        
-        month = month_map.get(month_name, 1)
-        
-        # پردازش بخش زمان
-        time_elements = time_part.split(':')
-        hour = int(time_elements[0])
-        minute = int(time_elements[1])
-        
-        # تبدیل
-        gregorian_date = jdatetime.datetime(year, month, day, hour, minute).togregorian()
-        return gregorian_date.strftime("%Y-%m-%d %H:%M:%S")
-        
-    except Exception as e:
-        # print(f"Error converting date '{persian_date_str}': {e}")
-        return ""
+# Parts of an article page parse_html reads
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['h1'], classes=['error_container', 'news_pdate_c', 'news_cat_c', 'subtitle', 'body_news', 'img_news'])
 
 def parse_html(html_content, page_id, url):
     """
     Parses the raw HTML content for Kayhan news.
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content, ARTICLE_REGIONS)
         
         error_container = soup.find('div', class_='error_container')
         if error_container and "صفحه درخواستی شما موجود نمی باشد" in error_container.get_text():
@@ -69,7 +28,7 @@ def parse_html(html_content, page_id, url):
             news_time = date_div.get_text(strip=True)
         
         # تبدیل تاریخ
-        gregorian_date = convert_persian_to_gregorian(news_time)
+        gregorian_date = persian_date.to_gregorian_str(news_time) or ""
         
         category = ""
         cat_div = soup.find('div', class_='news_cat_c')
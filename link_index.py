@@ -0,0 +1,123 @@
+import hashlib
+import math
+import os
+import threading
+
+import http_cache
+
+# Whether runners skip known links before fetching (turned off by scraper.py --refresh).
+# Saved links are added to the index either way.
+ENABLED = True
+# Listing crawls stop at the first list page whose links are all known (scraper.py --until-known)
+STOP_AT_KNOWN = False
+
+class BloomFilter:
+    """
+    In-memory Bloom filter. A negative answer is certain, a positive one only
+    means "maybe", so it is used to skip most index lookups for new links.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class LinkIndex(http_cache.SqliteStore):
+    """
+    Persistent set of article links that were already saved, with a Bloom
+    filter in front so most checks for new links never touch the disk.
+    """
+    schema = "CREATE TABLE IF NOT EXISTS links (link TEXT PRIMARY KEY)"
+
+    def __init__(self, path, use_bloom=True):
+        super().__init__(path)
+        self.bloom = None
+        if use_bloom:
+            count = self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+            self.bloom = BloomFilter(max(100000, count * 2))
+            for (link,) in self.conn.execute("SELECT link FROM links"):
+                self.bloom.add(link)
+
+    def contains(self, link):
+        if not link:
+            return False
+        if self.bloom is not None and link not in self.bloom:
+            return False
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM links WHERE link = ?", (link,)).fetchone()
+        return row is not None
+
+    def add_many(self, links):
+        links = [link for link in links if link]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR IGNORE INTO links (link) VALUES (?)", ((link,) for link in links))
+            self.conn.execute("COMMIT")
+            if self.bloom is not None:
+                for link in links:
+                    self.bloom.add(link)
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LinkIndex(os.path.join(http_cache.CACHE_DIR, 'links.sqlite'))
+    return _index
+
+def is_known(url, short_link=False):
+    """
+    True if the article at url was saved in an earlier run.
+    Short links are looked up through the redirect cache first.
+    """
+    if not ENABLED:
+        return False
+    if short_link:
+        url = http_cache.get_redirect_cache().get(url)
+    return get_index().contains(url)
+
+def filter_known(items, get_link):
+    """
+    Drops the items whose link is already in the index.
+    """
+    if not ENABLED:
+        return items
+    new_items = [item for item in items if not is_known(get_link(item))]
+    skipped = len(items) - len(new_items)
+    if skipped:
+        print(f"  Skipping {skipped} already scraped links.")
+    return new_items
+
+def page_is_known(items, new_items):
+    """
+    True when pagination should stop: STOP_AT_KNOWN is on and a list page had
+    items but none of them were new. List pages run newest first, so every
+    page after it is older still.
+    """
+    return STOP_AT_KNOWN and ENABLED and bool(items) and not new_items
+
+def add_records(records):
+    get_index().add_many([record.get('Link') for record in records])
+
+def configure(enabled=None, stop_at_known=None):
+    global ENABLED, STOP_AT_KNOWN
+    if enabled is not None:
+        ENABLED = enabled
+    if stop_at_known is not None:
+        STOP_AT_KNOWN = stop_at_known
@@ -1,60 +1,18 @@
-from bs4 import BeautifulSoup
 from datetime import datetime
-import re
-import jdatetime
 
-MONTH_MAPPING = {
-    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
-    "تیر": 4, "مرداد": 5, "شهریور": 6,
-    "مهر": 7, "آبان": 8, "آذر": 9,
-    "دی": 10, "بهمن": 11, "اسفند": 12
-}
+import persian_date
+import soup_factory
 
-def convert_to_gregorian(persian_date_str):
-    if not persian_date_str:
-        return None
-    try:
-        # Normalize digits
-        persian_digits = "۰۱۲۳۴۵۶۷۸۹"
-        english_digits = "0123456789"
-        translation_table = str.maketrans(persian_digits, english_digits)
-        normalized_date = persian_date_str.translate(translation_table)
-        
-        # Regex to find day, month name, year, time
-        # Example: 13 Tir 1403 - 08:38
-        parts = re.split(r'\s+|[-،,]', normalized_date)
-        day, month, year = None, None, None
-        
-        for i, part in enumerate(parts):
-            if part in MONTH_MAPPING:
-                month = MONTH_MAPPING[part]
-                if i > 0 and parts[i-1].isdigit():
-                    day = int(parts[i-1])
-                if i + 1 < len(parts) and parts[i+1].isdigit():
-                    year = int(parts[i+1])
-                elif i + 2 < len(parts) and parts[i+2].isdigit(): # Sometimes there is a dash or space
-                     year = int(parts[i+2])
-                break
-        
-        hour, minute = 0, 0
-        time_match = re.search(r'(\d{1,2}):(\d{1,2})', normalized_date)
-        if time_match:
-            hour = int(time_match.group(1))
-            minute = int(time_match.group(2))
-
-        if day and month and year:
-            g_date = jdatetime.date(year, month, day).togregorian()
-            return datetime(g_date.year, g_date.month, g_date.day, hour, minute).strftime("%Y-%m-%d %H:%M:%S")
-            
-    except Exception:
-        pass
-    return None
+# Parts of an article page parse_html reads
+ARTICLE_REGIONS = soup_factory.Regions(
+    tags=['h1'], classes=['summary', 'item-date'],
+    attrs={'itemprop': 'articleBody', 'property': 'article:published_time'})
 
 def parse_html(html, page_id, url=None):
     """
     Parses the HTML content of a Mashregh News page.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = soup_factory.make_soup(html, ARTICLE_REGIONS, fast=True)
 
     # عنوان
     title_tag = soup.find("h1", class_="title")
@@ -93,7 +51,7 @@ def parse_html(html, page_id, url=None):
     
     # Fallback for Gregorian if meta tag failed
     if not gregorian_date and time_text:
-        gregorian_date = convert_to_gregorian(time_text)
+        gregorian_date = persian_date.to_gregorian_str(time_text)
     
     # Return dictionary matching scraper.py columns
     result = {
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import soup_factory
+
+# Processes that parse pages (scraper.py --parse-processes). 0 parses in the
+# fetching thread, as before.
+PROCESSES = 0
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _init_worker(parser, strain, engine):
+    # Worker processes start fresh: carry over the parser settings of the run
+    soup_factory.PARSER = parser
+    soup_factory.STRAIN = strain
+    soup_factory.ENGINE = engine
+
+def _parse(func, data, args):
+    return func(data.decode('utf-8'), *args)
+
+def _noop():
+    return None
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forked workers need no re-import of the scraper; elsewhere
+            # (Windows, macOS) the platform default start method is used
+            context = multiprocessing.get_context('fork' if sys.platform.startswith('linux') else None)
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=context, initializer=_init_worker,
+                                        initargs=(soup_factory.PARSER, soup_factory.STRAIN, soup_factory.ENGINE))
+        return _pool
+
+def start():
+    """
+    Starts the worker processes right away. Call it before any fetch threads
+    exist: forking a process that is running threads is not safe.
+    """
+    if PROCESSES:
+        get_pool().submit(_noop).result()
+
+def parse(func, html, *args):
+    """
+    Returns func(html, *args). With PROCESSES set, the call runs in the parse
+    pool and the calling (fetch) thread just waits for it, so BeautifulSoup
+    work no longer holds the GIL of the fetching process. The HTML is sent as
+    UTF-8 bytes. func must be a module level function, e.g. hamshahri_scraper.parse_html.
+    """
+    if not PROCESSES:
+        return func(html, *args)
+    return get_pool().submit(_parse, func, html.encode('utf-8'), args).result()
+
+async def parse_async(loop, func, html, *args):
+    """
+    parse() for asyncio code: the event loop keeps fetching while the page is parsed.
+    """
+    if not PROCESSES:
+        return func(html, *args)
+    return await loop.run_in_executor(get_pool(), _parse, func, html.encode('utf-8'), args)
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def configure(processes=None):
+    global PROCESSES
+    if processes is not None:
+        PROCESSES = processes if processes >= 0 else os.cpu_count() or 1
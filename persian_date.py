@@ -0,0 +1,159 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+MONTHS = {
+    "فروردین": 1, "اردیبهشت": 2, "خرداد": 3,
+    "تیر": 4, "مرداد": 5, "شهریور": 6,
+    "مهر": 7, "آبان": 8, "آذر": 9,
+    "دی": 10, "بهمن": 11, "اسفند": 12
+}
+
+# Persian and Arabic-Indic digits to ASCII, Arabic yeh/kaf to the Persian letters
+DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩يك", "01234567890123456789یک")
+
+# Days before each Jalali month in a year
+MONTH_START = (0, 31, 62, 93, 124, 155, 186, 216, 246, 276, 306, 336)
+# Jalali day numbers count from 1600-01-01 (Gregorian), as in jalali.c / jdatetime
+EPOCH = date(1600, 1, 1).toordinal()
+
+FORMAT = "%Y-%m-%d %H:%M:%S"
+# Distinct date strings remembered. List pages repeat the same few dates, so this is plenty.
+CACHE_SIZE = 4096
+
+# 1402/11/29, 1402-11-29
+NUMERIC_DATE = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})')
+# 24 آبان 1403, 12-دی-1402, ۲۱ آذر، ۱۴۰۴
+_SEPARATOR = r'[\s\-_،,]*'
+TEXT_DATE = re.compile(r'(\d{1,2})' + _SEPARATOR + '(' + '|'.join(MONTHS) + ')' + _SEPARATOR + r'(\d{4})')
+TIME = re.compile(r'(\d{1,2}):(\d{1,2})')
+
+def normalize(text):
+    return text.translate(DIGITS)
+
+def day_number(year, month_start, day):
+    """
+    Days from 1600-01-01 to a Jalali date; month_start is MONTH_START[month - 1].
+    Plain arithmetic, so it works element-wise on NumPy arrays as well.
+    """
+    jy = year - 979
+    return 365 * jy + (jy // 33) * 8 + (jy % 33 + 3) // 4 + month_start + day - 1 + 79
+
+def is_leap(year):
+    return day_number(year + 1, 0, 1) - day_number(year, 0, 1) == 366
+
+def jalali_to_gregorian(year, month, day):
+    """
+    Gregorian date for a Jalali date. Raises ValueError for a date that does
+    not exist (month 13, 31 Mehr, 30 Esfand of a common year).
+    """
+    if not 1 <= month <= 12:
+        raise ValueError(f"month must be in 1..12, not {month}")
+    days = 31 if month <= 6 else 30 if month <= 11 else 30 if is_leap(year) else 29
+    if not 1 <= day <= days:
+        raise ValueError(f"day must be in 1..{days}, not {day}")
+    return date.fromordinal(EPOCH + day_number(year, MONTH_START[month - 1], day))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_gregorian(text):
+    """
+    Converts a Jalali date as the sites print it (numeric or with the month
+    name, optionally with a weekday, labels and HH:MM) to a Gregorian datetime.
+    Years past 1700 are taken as Gregorian already. Returns None if there is
+    no valid date in text.
+    """
+    if not text:
+        return None
+    text = normalize(text)
+    match = NUMERIC_DATE.search(text)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+    else:
+        match = TEXT_DATE.search(text)
+        if not match:
+            return None
+        day, month, year = int(match.group(1)), MONTHS[match.group(2)], int(match.group(3))
+
+    hour, minute = 0, 0
+    time_match = TIME.search(text)
+    if time_match:
+        hour, minute = int(time_match.group(1)), int(time_match.group(2))
+
+    try:
+        if year > 1700:
+            return datetime(year, month, day, hour, minute)
+        g_date = jalali_to_gregorian(year, month, day)
+        return datetime(g_date.year, g_date.month, g_date.day, hour, minute)
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_gregorian_str(text):
+    """
+    to_gregorian() formatted like the Gregorian_Date column ("2024-01-02 10:30:00"), or None.
+    """
+    g_date = to_gregorian(text)
+    return g_date.strftime(FORMAT) if g_date else None
+
+def _numbers(column):
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype=float)
+
+def to_gregorian_series(times):
+    """
+    to_gregorian_str() for a whole column (e.g. the Time column of an export)
+    in one pass. Each distinct string is handled once: digits are translated
+    and the date parts extracted with the pandas string methods, the calendar
+    arithmetic and checks run on NumPy arrays. Returns a Series of
+    "%Y-%m-%d %H:%M:%S" strings (None where there is no valid date) with the
+    index of times.
+    """
+    times = pd.Series(times, dtype=object)
+    # An export repeats the same few thousand dates: convert the distinct ones
+    codes, uniques = pd.factorize(times)
+    converted = np.append(_convert_unique(pd.Series(uniques, dtype=object)), None)
+    # Missing values have code -1, which picks the None at the end
+    return pd.Series(converted[codes], index=times.index, dtype=object)
+
+def _convert_unique(times):
+    if times.empty:
+        return np.array([], dtype=object)
+    text = times.str.translate(DIGITS)
+    numeric = text.str.extract(NUMERIC_DATE)
+    named = text.str.extract(TEXT_DATE)
+    clock = text.str.extract(TIME)
+
+    # Numeric dates win over month names, like in to_gregorian()
+    has_numeric = numeric[0].notna().to_numpy()
+    year = np.where(has_numeric, _numbers(numeric[0]), _numbers(named[2]))
+    month = np.where(has_numeric, _numbers(numeric[1]), _numbers(named[1].map(MONTHS)))
+    day = np.where(has_numeric, _numbers(numeric[2]), _numbers(named[0]))
+    hour = np.nan_to_num(_numbers(clock[0]))
+    minute = np.nan_to_num(_numbers(clock[1]))
+
+    valid = ~np.isnan(year) & (month >= 1) & (month <= 12) & (day >= 1) & (hour < 24) & (minute < 60)
+    year = np.where(valid, year, 1400).astype(np.int64)
+    month = np.where(valid, month, 1).astype(np.int64)
+    day = np.where(valid, day, 1).astype(np.int64)
+
+    # Jalali: day numbers from 1600-01-01, 31/30/29 (30 in leap years) days a month
+    leap = day_number(year + 1, 0, 1) - day_number(year, 0, 1) == 366
+    jalali_days = np.where(month <= 6, 31, np.where(month <= 11, 30, np.where(leap, 30, 29)))
+    offsets = day_number(year, np.array(MONTH_START)[month - 1], day)
+    jalali = np.datetime64('1600-01-01', 'D') + offsets.astype('timedelta64[D]')
+
+    # Years past 1700 are Gregorian already
+    gregorian_month = (year - 1970).astype('datetime64[Y]') + (month - 1).astype('timedelta64[M]')
+    gregorian_days = ((gregorian_month + 1).astype('datetime64[D]') - gregorian_month.astype('datetime64[D]')).astype(np.int64)
+    gregorian = gregorian_month.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+
+    is_gregorian = year > 1700
+    valid &= day <= np.where(is_gregorian, gregorian_days, jalali_days)
+    dates = np.where(is_gregorian, gregorian, jalali).astype('datetime64[s]')
+    dates = dates + (hour.astype(np.int64) * 3600 + minute.astype(np.int64) * 60).astype('timedelta64[s]')
+
+    result = np.char.replace(np.datetime_as_string(dates, unit='s'), 'T', ' ').astype(object)
+    result[~valid] = None
+    return result
@@ -0,0 +1,214 @@
+import queue
+import threading
+
+# Items waiting between two stages. Keeps memory flat however long the run is.
+QUEUE_SIZE = 100
+# Records per save_batch call (scraper.py --batch-size)
+BATCH_SIZE = 200
+
+_DONE = object()
+
+_writers = set()
+_writers_lock = threading.Lock()
+
+def _put(q, value, stop):
+    while not stop.is_set():
+        try:
+            q.put(value, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.5)
+        except queue.Empty:
+            pass
+    return _DONE
+
+def stream(items, func, workers, queue_size=None, on_error=None):
+    """
+    Runs func(item) on `workers` threads and yields (item, result) pairs as
+    they finish. Items are pulled from the iterable only as fast as results
+    are consumed, so neither side ever holds more than queue_size entries.
+    If func raises, the error is printed and on_error is yielded as the result.
+    Stages chain: stream(stream(ids, fetch, 20), parse, 2).
+    """
+    queue_size = queue_size or max(QUEUE_SIZE, workers * 2)
+    inbox = queue.Queue(maxsize=queue_size)
+    outbox = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    feed_errors = []
+
+    def feed():
+        try:
+            for item in items:
+                if not _put(inbox, item, stop):
+                    return
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            for _ in range(workers):
+                _put(inbox, _DONE, stop)
+
+    def work():
+        while True:
+            item = _get(inbox, stop)
+            if item is _DONE:
+                _put(outbox, _DONE, stop)
+                return
+            try:
+                result = func(item)
+            except Exception as e:
+                print(f"{item}: Error - {e}")
+                result = on_error
+            if not _put(outbox, (item, result), stop):
+                return
+
+    # Daemon threads, so Ctrl-C in the consumer ends the run right away
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = workers
+        while running:
+            entry = outbox.get()
+            if entry is _DONE:
+                running -= 1
+            else:
+                yield entry
+        if feed_errors:
+            raise feed_errors[0]
+    finally:
+        stop.set()
+
+def merge(sources, workers, queue_size=None):
+    """
+    Drains up to `workers` iterables at once, each on its own thread, and yields
+    their items as they arrive. sources is consumed lazily, so it can be a
+    generator of generators (e.g. one per day of a date range). An error in one
+    source is printed and only ends that source.
+    """
+    queue_size = queue_size or max(QUEUE_SIZE, workers * 2)
+    inbox = queue.Queue(maxsize=workers)
+    outbox = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    feed_errors = []
+
+    def feed():
+        try:
+            for source in sources:
+                if not _put(inbox, source, stop):
+                    return
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            for _ in range(workers):
+                _put(inbox, _DONE, stop)
+
+    def work():
+        while True:
+            source = _get(inbox, stop)
+            if source is _DONE:
+                _put(outbox, _DONE, stop)
+                return
+            try:
+                for item in source:
+                    if not _put(outbox, item, stop):
+                        return
+            except Exception as e:
+                print(f"Error - {e}")
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = workers
+        while running:
+            entry = outbox.get()
+            if entry is _DONE:
+                running -= 1
+            else:
+                yield entry
+        if feed_errors:
+            raise feed_errors[0]
+    finally:
+        stop.set()
+
+class BatchWriter:
+    """
+    Sink stage: collects records and hands them to save(batch) in batches on
+    a background thread, so results appear while the run goes on and only a
+    couple of batches are ever held in memory.
+    """
+
+    def __init__(self, save, batch_size=None):
+        self.save = save
+        self.batch_size = batch_size or BATCH_SIZE
+        self.batch = []
+        self.count = 0
+        self.lock = threading.Lock()
+        # At most two full batches wait for the sink; add() blocks beyond that
+        self.batches = queue.Queue(maxsize=2)
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        with _writers_lock:
+            _writers.add(self)
+
+    def _run(self):
+        while True:
+            batch = self.batches.get()
+            if batch is _DONE:
+                return
+            try:
+                self.save(batch)
+            except Exception as e:
+                print(f"Error saving batch: {e}")
+
+    def add(self, record):
+        if not record:
+            return
+        with self.lock:
+            self.batch.append(record)
+            self.count += 1
+            if len(self.batch) < self.batch_size:
+                return
+            batch, self.batch = self.batch, []
+        self.batches.put(batch)
+
+    def close(self):
+        """
+        Saves the last partial batch and waits until everything is written.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            batch, self.batch = self.batch, []
+        with _writers_lock:
+            _writers.discard(self)
+        if batch:
+            self.batches.put(batch)
+        self.batches.put(_DONE)
+        self.thread.join()
+
+def close_all():
+    """
+    Closes the writers a runner left open, e.g. when it was interrupted.
+    """
+    with _writers_lock:
+        writers = list(_writers)
+    for writer in writers:
+        writer.close()
+
+def configure(batch_size=None):
+    global BATCH_SIZE
+    if batch_size:
+        BATCH_SIZE = batch_size
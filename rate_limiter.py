@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Starting point for every host. The limiter moves away from these values
+# on its own: slow start (the rate grows by one request per second with every
+# fast success, i.e. doubles each second) until the host first throttles us,
+# then additive increase while it answers quickly, and multiplicative
+# decrease as soon as it throttles us (429/503) or times out.
+# configure() seeds them from --workers / --concurrency.
+INITIAL_RATE = 5.0          # requests per second
+INITIAL_CONCURRENCY = 5.0   # requests in flight
+MIN_RATE = 0.2
+MAX_RATE = 100.0
+MIN_CONCURRENCY = 1.0
+MAX_CONCURRENCY = 256.0
+RATE_STEP = 0.1             # added to the rate after each fast success
+SLOW_START_STEP = 1.0       # added instead until the first throttle signal
+DECREASE_FACTOR = 0.5       # applied to rate and concurrency on throttling
+LATENCY_FACTOR = 2.0        # latency above baseline * factor counts as "not flat"
+MAX_RETRY_AFTER = 600       # never pause a host longer than this (seconds)
+
+THROTTLE_STATUSES = (429, 503)
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header (delta seconds or HTTP date).
+    Returns seconds to wait, or None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+            seconds = retry_at.timestamp() - time.time()
+        except Exception:
+            return None
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+class HostLimiter:
+    """
+    Token bucket (requests per second) plus an AIMD controlled limit on
+    requests in flight for a single host.
+    Usable from threads (acquire) and from asyncio (acquire_async).
+    """
+
+    def __init__(self, rate=None, concurrency=None):
+        self.lock = threading.Lock()
+        self.rate = rate or INITIAL_RATE
+        self.concurrency = concurrency or INITIAL_CONCURRENCY
+        # Grow quickly until the host pushes back for the first time
+        self.slow_start = True
+        self.tokens = max(self.rate, 1.0)
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.baseline_latency = None
+
+    def _reserve(self):
+        """
+        Takes a token and a concurrency slot if both are free.
+        Returns 0 on success, otherwise the number of seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+
+            self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            if self.in_flight >= int(self.concurrency):
+                return 0.05
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, status=None, latency=None, retry_after=None, timed_out=False):
+        """
+        Frees the slot taken by acquire() and adapts rate/concurrency to the outcome.
+        """
+        with self.lock:
+            # Only grow when the current limit is actually what holds us back
+            limited = self.in_flight >= int(self.concurrency)
+            self.in_flight = max(self.in_flight - 1, 0)
+
+            if timed_out or status in THROTTLE_STATUSES:
+                self.slow_start = False
+                self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+                self.concurrency = max(MIN_CONCURRENCY, self.concurrency * DECREASE_FACTOR)
+                self.tokens = min(self.tokens, 0)
+                wait = parse_retry_after(retry_after)
+                if wait:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + wait)
+                return
+
+            if status is None or latency is None:
+                return
+
+            if self.baseline_latency is None:
+                self.baseline_latency = latency
+            flat = latency <= self.baseline_latency * LATENCY_FACTOR
+            # Slow moving average so a single fast response does not reset the baseline
+            self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency
+
+            if flat and self.slow_start:
+                self.rate = min(MAX_RATE, self.rate + SLOW_START_STEP)
+                if limited:
+                    self.concurrency = min(MAX_CONCURRENCY, self.concurrency + 1.0)
+            elif flat:
+                self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+                if limited:
+                    self.concurrency = min(MAX_CONCURRENCY, self.concurrency + 1.0 / self.concurrency)
+
+# One limiter per host, shared by all workers of the process
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(host):
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter()
+            _limiters[host] = limiter
+    return limiter
+
+def configure(rate=None, concurrency=None):
+    """
+    Sets the starting rate / requests in flight for hosts seen from now on.
+    """
+    global INITIAL_RATE, INITIAL_CONCURRENCY
+    if rate:
+        INITIAL_RATE = min(MAX_RATE, max(MIN_RATE, float(rate)))
+    if concurrency:
+        INITIAL_CONCURRENCY = min(MAX_CONCURRENCY, max(MIN_CONCURRENCY, float(concurrency)))
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import os
+import threading
+from datetime import datetime
+
+import http_cache
+
+# zstd compresses HTML better and much faster than gzip; gzip is the fallback
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# None: cache not used, 'store': fetch() writes every page, 'replay': fetch() only reads
+MODE = None
+
+class RawCache(http_cache.SqliteStore):
+    """
+    Content-addressed store of raw HTML.
+    Bodies live in objects/<sha[:2]>/<sha>.html.zst (or .gz), identical pages are
+    stored once. index.sqlite maps each requested URL to its body.
+    """
+    schema = """CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        final_url TEXT,
+        sha256 TEXT NOT NULL,
+        fetched_at TEXT
+    )"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        super().__init__(os.path.join(directory, 'index.sqlite'))
+        self._local = threading.local()
+
+    def _object_path(self, sha, ext):
+        return os.path.join(self.objects_dir, sha[:2], f"{sha}.html.{ext}")
+
+    def _compress(self, data):
+        if HAS_ZSTD:
+            compressor = getattr(self._local, 'compressor', None)
+            if compressor is None:
+                compressor = self._local.compressor = zstandard.ZstdCompressor(level=10)
+            return compressor.compress(data), 'zst'
+        return gzip.compress(data, compresslevel=6), 'gz'
+
+    def _read_object(self, sha):
+        path = self._object_path(sha, 'zst')
+        if os.path.exists(path):
+            if not HAS_ZSTD:
+                raise RuntimeError("zstandard is required to read this cache")
+            with open(path, 'rb') as f:
+                return zstandard.ZstdDecompressor().decompress(f.read())
+        with open(self._object_path(sha, 'gz'), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def put(self, url, final_url, text):
+        data = text.encode('utf-8')
+        sha = hashlib.sha256(data).hexdigest()
+
+        if not (os.path.exists(self._object_path(sha, 'zst')) or os.path.exists(self._object_path(sha, 'gz'))):
+            blob, ext = self._compress(data)
+            path = self._object_path(sha, ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so a crash never leaves a truncated object
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, final_url, sha256, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, final_url, sha, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    def get(self, url):
+        """
+        Returns (html, final_url) for a cached URL, or None.
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT final_url, sha256 FROM pages WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        try:
+            return self._read_object(row[1]).decode('utf-8'), row[0]
+        except FileNotFoundError:
+            return None
+
+    def iter_urls(self, prefix='', chunk_size=1000):
+        """
+        Yields every cached URL starting with prefix, in order.
+        Reads the index in chunks so huge caches are never loaded at once.
+        """
+        last = prefix
+        inclusive = True
+        while True:
+            op = '>=' if inclusive else '>'
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT url FROM pages WHERE url {op} ? AND url < ? ORDER BY url LIMIT ?",
+                    (last, prefix + '\uffff', chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[0]
+            last = rows[-1][0]
+            inclusive = False
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_raw_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RawCache(os.path.join(http_cache.CACHE_DIR, 'raw'))
+    return _cache
+
+def configure(mode=None):
+    global MODE
+    MODE = mode
@@ -1,6 +1,7 @@
-from bs4 import BeautifulSoup
 import urllib.parse
 
+import soup_factory
+
 def parse_html(html_content, url):
     """
     Parses the wiki page content.
@@ -9,7 +10,7 @@ def parse_html(html_content, url):
         - next_page: URL of the next page (if any)
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = soup_factory.make_soup(html_content)
         base_url = "https://fa.wikipedia.org"
         items = []
 
@@ -1,13 +1,24 @@
 import argparse
-import requests
-import time
-import os
-import pandas as pd
+import re
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import jdatetime
-import cloudscraper
-from bs4 import BeautifulSoup
+
+import http_client
+import http_cache
+import rate_limiter
+import raw_cache
+import async_engine
+import storage
+import link_index
+import checkpoint
+import pipeline
+import id_probe
+import sparse_ids
+import discovery
+import soup_factory
+import parse_pool
+from http_client import fetch_url
 
 # Import for Keyword Extraction
 try:
@@ -42,41 +53,18 @@ except ImportError as e:
 
 # Global Configuration
 MAX_WORKERS = 5
+# Days crawled at once by the date based runners (Ettelaat, Euronews)
+DAY_WORKERS = 4
 COLUMNS = ['Title', 'Link', 'Image', 'Description', 'Time', 'Gregorian_Date', 'Scraped_Date', 'Page', 'Subject', 'Full_Text', 'Keywords']
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+# Returned by the ID page processors when a page could not be fetched and should be retried
+FAILED = "failed"
+# Returned by the ID page processors when the article was saved in an earlier run
+KNOWN = "known"
+# Returned by the ID page processors when the ID answered 404 (only these count as dead IDs)
+MISSING = "missing"
 
-def fetch_url(url, retries=3, use_cloudscraper=False):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    scraper = None
-    if use_cloudscraper:
-        scraper = cloudscraper.create_scraper(
-             browser={'browser': 'chrome', 'platform': 'windows', 'mobile': False}
-        )
-
-    for attempt in range(retries):
-        try:
-            if use_cloudscraper:
-                response = scraper.get(url, timeout=30)
-            else:
-                response = requests.get(url, headers=headers, timeout=30)
-                
-            if response.status_code == 200:
-                return response.text, 200
-            elif response.status_code == 404:
-                return None, 404
-            else:
-                # print(f"Error fetching {url}: Status {response.status_code}")
-                pass
-        except Exception as e:
-            # print(f"Request error for {url}: {e}")
-            pass
-        time.sleep(1)
-    return None, 0
+# Keep one pooled connection per worker for each host
+http_client.configure(pool_size=MAX_WORKERS)
 
 def extract_keywords_tfidf(results, top_n=10):
     """
@@ -150,111 +138,195 @@ def extract_keywords_tfidf(results, top_n=10):
 
 def save_batch(results, output_file):
     """
-    Saves a batch of results to the Excel file.
-    Handles existing files and deduplication.
+    Appends a batch of results to the configured storage sink (see storage.py).
+    Deduplication on Link is handled by the sink. Returns False if the batch
+    could not be saved.
     """
     if not results:
-        return
+        return True
     
     # Calculate Keywords before saving
     if HAS_TFIDF:
         print("Calculating TF-IDF keywords...")
         results = extract_keywords_tfidf(results)
 
-    new_df = pd.DataFrame(results)
+    # Parsers that found no Gregorian date leave it to one pass over the batch
+    storage.fill_gregorian_dates(results)
     
-    # Ensure all columns exist
-    for col in COLUMNS:
-        if col not in new_df.columns:
-            new_df[col] = None
-    new_df = new_df[COLUMNS]
-
-    if os.path.exists(output_file):
-        try:
-            existing_df = pd.read_excel(output_file)
-            updated_df = pd.concat([existing_df, new_df], ignore_index=True)
-            
-            # Deduplication logic
-            # Prefer 'Link' if available, otherwise 'Page' + 'Title' combination
-            if 'Link' in updated_df.columns and updated_df['Link'].notna().any():
-                 updated_df.drop_duplicates(subset=['Link'], keep='last', inplace=True)
-            elif 'Page' in updated_df.columns:
-                 updated_df.drop_duplicates(subset=['Page'], keep='last', inplace=True)
-            
-        except Exception as e:
-            print(f"Error reading existing file: {e}")
-            updated_df = new_df
-    else:
-        updated_df = new_df
-        
     try:
-        updated_df.to_excel(output_file, index=False)
-        print(f"Saved {len(results)} new records. Total records: {len(updated_df)} in {output_file}")
+        storage.get_sink(output_file, COLUMNS).write(results)
+        # Only saved links count as known, so a crash never hides unsaved articles
+        link_index.add_records(results)
     except Exception as e:
-        print(f"Error saving to Excel: {e}")
+        print(f"Error saving batch: {e}")
+        return False
+    return True
+
+# -------------------------------------------------------------------------
+# ID Range Runner (shared by the ID based sites)
+# -------------------------------------------------------------------------
+def sparse_page_ids(site, sweep, page_ids, blocking=True):
+    """
+    Wraps the pending IDs of a sweep so dead ID regions are skipped (see sparse_ids.py).
+    Returns (ids, sparse); sparse is None unless --sparse is given.
+    """
+    if not sparse_ids.ENABLED:
+        return page_ids, None
+    
+    def mark_skipped(skipped):
+        for page_id in skipped:
+            sweep.record(page_id, None)
+    
+    sparse = sparse_ids.SparseIds(page_ids, dead=sparse_ids.get_dead_ranges(site),
+                                  on_skip=mark_skipped, blocking=blocking)
+    return sparse, sparse
+
+def run_id_range(site, name, process_page, start, count, output, resume=False):
+    """
+    Streams every ID of the range through process_page(page_id) on MAX_WORKERS threads.
+    Results and progress are flushed every checkpoint.FLUSH_EVERY pages; with
+    resume=True the IDs finished by an earlier run are skipped and failed IDs retried.
+    """
+    print(f"--- Running {name} Scraper (Starting from ID {start}, Count: {count}) ---")
+    
+    sweep = checkpoint.open_sweep(output, lambda results: save_batch(results, output), resume=resume)
+    page_ids, sparse = sparse_page_ids(site, sweep, sweep.checkpoint.pending(start, count))
+    try:
+        pages = pipeline.stream(page_ids, process_page, MAX_WORKERS, on_error=FAILED)
+        for page_id, data in pages:
+            if data == FAILED:
+                live = None
+                sweep.record(page_id, None, failed=True)
+            elif data == KNOWN:
+                live = True
+                sweep.record(page_id, None)
+            elif data == MISSING:
+                live = False
+                sweep.record(page_id, None)
+            else:
+                live = True if data else None
+                if data:
+                    print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
+                sweep.record(page_id, data)
+            if sparse:
+                sparse.record(page_id, live)
+    finally:
+        # Also on Ctrl-C: keep everything that has finished
+        if sparse:
+            sparse.finish()
+        sweep.close()
+
+# -------------------------------------------------------------------------
+# List Page Runner (shared by the paginated sites)
+# -------------------------------------------------------------------------
+def run_article_pipeline(items, process_item, output, validators=None):
+    """
+    Fetches the articles yielded by items on one long-lived pool of MAX_WORKERS threads.
+    items is a generator that fetches the list pages itself, so the next list page
+    is requested while the workers are still busy with the articles of the last one,
+    never more than a queue ahead.
+    validators (http_cache.PendingValidators) holds the list page validators;
+    they are stored at the end for the pages whose articles were all saved.
+    """
+    def write(batch):
+        if not save_batch(batch, output) and validators:
+            validators.discard()
+
+    writer = pipeline.BatchWriter(write)
+    for item, res in pipeline.stream(items, process_item, MAX_WORKERS):
+        if res:
+            writer.add(res)
+            print(f"Extracted: {(res.get('Title') or 'No Title')[:30]}")
+        elif validators:
+            validators.item_failed(item)
+    writer.close()
+    if validators:
+        validators.commit()
+
+def list_page_items(pages, parse_list_page, validators):
+    """
+    Fetches the list pages given as (page_num, url) pairs and yields their new items.
+    Stops at the first page without items, and with --until-known at the first
+    page (or unchanged page) without new items.
+    The validators of each page are handed to validators (http_cache.PendingValidators).
+    """
+    # Items move down while we paginate, so the next page can repeat some of them
+    seen = set()
+    for page_num, url in pages:
+        print(f"Processing Page {page_num}: {url}")
+        
+        result = http_client.fetch(url, conditional=True)
+        html = result.text
+        if result.not_modified:
+            if link_index.STOP_AT_KNOWN:
+                print("  Page not modified since last run. Stopping.")
+                return
+            print("  Page not modified since last run. Skipping.")
+            continue
+        if not html:
+            print("  Failed to fetch page.")
+            continue
+            
+        items = parse_list_page(html)
+        print(f"  Found {len(items)} items.")
+        
+        if not items:
+            print("  No items found. Stopping.")
+            return
+        
+        new_items = link_index.filter_known(items, lambda item: item['Link'])
+        if link_index.page_is_known(items, new_items):
+            print("  All items already scraped. Stopping.")
+            return
+        
+        new_items = [item for item in new_items if item['Link'] not in seen]
+        seen.update(item['Link'] for item in new_items)
+        validators.add(result, new_items, lambda item: item['Link'])
+        yield from new_items
 
 # -------------------------------------------------------------------------
 # Hamshahri Runner
 # -------------------------------------------------------------------------
 def process_hamshahri_page(page_id):
     url = f"https://www.hamshahrionline.ir/news/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = hamshahri_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.ok:
+        data = parse_pool.parse(hamshahri_scraper.parse_html, result.text, page_id, url)
         if data:
             return data
-    elif status != 404:
-        # print(f"Failed to fetch {url} (Status: {status})")
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_hamshahri(start, count, output):
-    print(f"--- Running Hamshahri Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_hamshahri_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_hamshahri(start, count, output, resume=False):
+    run_id_range('hamshahri', "Hamshahri", process_hamshahri_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Kayhan Runner
 # -------------------------------------------------------------------------
 def process_kayhan_page(page_id):
     url = f"https://kayhan.ir/fa/news/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = kayhan_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.transient:
+        return FAILED
+    if result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
+    if result.ok:
+        data = parse_pool.parse(kayhan_scraper.parse_html, result.text, page_id, url)
         if data == "404":
-            return None # Page not found
+            return MISSING # Page not found
         if data:
             return data
     return None
 
-def run_kayhan(start, count, output):
-    print(f"--- Running Kayhan Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_kayhan_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-
-    save_batch(results, output)
+def run_kayhan(start, count, output, resume=False):
+    run_id_range('kayhan', "Kayhan", process_kayhan_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Ettelaat Runner
@@ -262,13 +334,14 @@ def run_kayhan(start, count, output):
 def process_ettelaat_article(item, page_num):
     html, status = fetch_url(item['Link'])
     if html:
-        details = ettelaat_scraper.parse_article_page(html, item['Link'])
+        details = parse_pool.parse(ettelaat_scraper.parse_article_page, html, item['Link'])
         if details:
+            # Archive items carry the title and time; sitemap entries leave them to the article
             return {
-                "Title": item['Title'],
+                "Title": item.get('Title') or details.get("Title"),
                 "Link": item['Link'],
-                "Time": item['Time'],
-                "Gregorian_Date": item.get('Gregorian_Date'),
+                "Time": item.get('Time') or details.get("Time"),
+                "Gregorian_Date": item.get('Gregorian_Date') or details.get("Gregorian_Date"),
                 "Description": item.get('Description'),
                 "Image": item.get('Image'),
                 "Page": page_num,
@@ -278,68 +351,61 @@ def process_ettelaat_article(item, page_num):
             }
     return None
 
+def ettelaat_day_items(date):
+    """
+    Walks the archive pages of one day and yields (item, page) for every new article.
+    """
+    print(f"Processing Date: {date}")
+    page = 1
+    empty_streak = 0
+    
+    while True:
+        url = f"https://www.ettelaat.com/archive?pi={page}&ms=0&dy={date.day}&mn={date.month}&yr={date.year}"
+        html, status = fetch_url(url)
+        
+        if not html:
+            break
+            
+        items = ettelaat_scraper.parse_archive_page(html)
+        if not items:
+            empty_streak += 1
+            if empty_streak > 2: # Stop if 2 consecutive empty pages
+                break
+        else:
+            empty_streak = 0
+            print(f"  {date}: Found {len(items)} items on page {page}")
+            for item in link_index.filter_known(items, lambda item: item['Link']):
+                yield item, page
+        
+        page += 1
+        if page > 50: # Safety limit per day
+            break
+
 def run_ettelaat(days, output):
     print(f"--- Running Ettelaat Scraper (Last {days} days) ---")
     
     end_date = jdatetime.date.today()
     start_date = end_date - jdatetime.timedelta(days=days-1)
     
-    current_date = start_date
-    all_results = []
-    
-    while current_date <= end_date:
-        print(f"Processing Date: {current_date}")
-        page = 1
-        empty_streak = 0
-        
-        while True:
-            url = f"https://www.ettelaat.com/archive?pi={page}&ms=0&dy={current_date.day}&mn={current_date.month}&yr={current_date.year}"
-            html, status = fetch_url(url)
-            
-            if not html:
-                break
-                
-            items = ettelaat_scraper.parse_archive_page(html)
-            if not items:
-                empty_streak += 1
-                if empty_streak > 2: # Stop if 2 consecutive empty pages
-                    break
-            else:
-                empty_streak = 0
-                print(f"  Found {len(items)} items on page {page}")
-                
-                # Fetch articles in parallel
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = []
-                    for item in items:
-                        futures.append(executor.submit(
-                            process_ettelaat_article, 
-                            item, page
-                        ))
-                    
-                    for future in as_completed(futures):
-                        res = future.result()
-                        if res:
-                            all_results.append(res)
-            
-            page += 1
-            if page > 50: # Safety limit per day
-                break
-        
-        current_date += jdatetime.timedelta(days=1)
-        
-    save_batch(all_results, output)
+    # DAY_WORKERS days are paginated at once, their articles share one pool
+    day_sources = (ettelaat_day_items(start_date + jdatetime.timedelta(days=i)) for i in range(days))
+    items = pipeline.merge(day_sources, DAY_WORKERS)
+    run_article_pipeline(items, lambda task: process_ettelaat_article(*task), output)
 
 # -------------------------------------------------------------------------
 # Asia News Runner
 # -------------------------------------------------------------------------
-def process_asianews_article(link, date_str):
+def asianews_link(link):
     if link.startswith("/"):
         link = "https://asianews.ir" + link
+    return link
+
+def process_asianews_article(link, date_str):
+    link = asianews_link(link)
         
     html, status = fetch_url(link)
     if html:
-        details = asianews_paper.parse_article_page(html, link)
+        details = parse_pool.parse(asianews_paper.parse_article_page, html, link)
         if details:
             return {
                 "Title": details.get("title"),
@@ -352,34 +418,46 @@ def process_asianews_article(link, date_str):
             }
     return None
 
-def run_asianews(start_page, count, output):
-    print(f"--- Running Asia News Scraper (Start Page: {start_page}, Count: {count}) ---")
-    
-    results = []
-    
+def asianews_list_items(start_page, count, validators):
+    """
+    Fetches the archive pages and yields (link, date, page) for every new article.
+    """
     for page in range(start_page, start_page + count):
         url = f"https://asianews.ir/archive?page={page}"
-        html, status = fetch_url(url)
+        result = http_client.fetch(url, conditional=True)
+        html = result.text
         
         if html:
-            items = asianews_paper.parse_archive_page(html)
-            if items:
-                print(f"Page {page}: Found {len(items)} articles.")
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = [executor.submit(process_asianews_article, item['link'], item['date']) for item in items]
-                    
-                    for future in as_completed(futures):
-                        res = future.result()
-                        if res:
-                            res['Page'] = page
-                            results.append(res)
-                            print(f"Extracted: {res.get('Title')[:30]}")
+            found = asianews_paper.parse_archive_page(html)
+            items = link_index.filter_known(found, lambda item: asianews_link(item['link']))
+            if link_index.page_is_known(found, items):
+                print(f"Page {page}: All articles already scraped. Stopping.")
+                return
+            tasks = [(item['link'], item['date'], page) for item in items]
+            validators.add(result, tasks, lambda task: task[0])
+            if tasks:
+                print(f"Page {page}: Found {len(tasks)} articles.")
+                yield from tasks
             else:
                 print(f"Page {page}: No items found.")
+        elif result.not_modified:
+            print(f"Page {page}: Not modified since last run.")
+            if link_index.STOP_AT_KNOWN:
+                return
         else:
             print(f"Page {page}: Failed to fetch.")
-            
-    save_batch(results, output)
+
+def process_asianews_task(task):
+    link, date_str, page = task
+    res = process_asianews_article(link, date_str)
+    if res:
+        res['Page'] = page
+    return res
+
+def run_asianews(start_page, count, output):
+    print(f"--- Running Asia News Scraper (Start Page: {start_page}, Count: {count}) ---")
+    validators = http_cache.PendingValidators()
+    run_article_pipeline(asianews_list_items(start_page, count, validators), process_asianews_task, output, validators)
 
 # -------------------------------------------------------------------------
 # Wiki Runner
@@ -394,7 +472,7 @@ def run_wiki(output):
     MAX_LIST_PAGES = 5
     page_count = 0
     
-    all_results = []
+    writer = pipeline.BatchWriter(lambda batch: save_batch(batch, output))
     
     while current_url and page_count < MAX_LIST_PAGES:
         print(f"Processing List Page: {current_url}")
@@ -407,6 +485,7 @@ def run_wiki(output):
         
         if parse_result and parse_result.get('type') == 'list':
             links = parse_result.get('links', [])
+            links = link_index.filter_known(links, lambda item: item['link'])
             next_page = parse_result.get('next_page')
             
             print(f"Found {len(links)} links. Fetching content...")
@@ -428,45 +507,35 @@ def run_wiki(output):
                                 "Scraped_Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                                 "Subject": "Wiki"
                             }
-                            all_results.append(record)
+                            writer.add(record)
             
             current_url = next_page
             page_count += 1
         else:
             break
             
-    save_batch(all_results, output)
+    writer.close()
 
 # -------------------------------------------------------------------------
 # Inn Runner
 # -------------------------------------------------------------------------
 def process_inn_page(page_id):
     url = f"https://inn.ir/news/article/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = inn_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.ok:
+        data = parse_pool.parse(inn_scraper.parse_html, result.text, page_id, url)
         if data:
             return data
-    elif status != 404:
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_inn(start, count, output):
-    print(f"--- Running Inn Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_inn_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_inn(start, count, output, resume=False):
+    run_id_range('inn', "Inn", process_inn_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Armandaily Runner
@@ -474,225 +543,168 @@ def run_inn(start, count, output):
 def process_arman_article(url, page_num):
     html, status = fetch_url(url)
     if html:
-        data = arman_scraper.parse_article_page(html, url)
+        data = parse_pool.parse(arman_scraper.parse_article_page, html, url)
         if data:
             data['Page'] = page_num
             return data
     return None
 
-def run_arman(start_page, count, output):
-    print(f"--- Running Armandaily Scraper (Start Page: {start_page}, Count: {count}) ---")
-    results = []
-    
+def arman_list_items(start_page, count, validators):
+    """
+    Fetches the archive pages and yields (link, page) for every new article.
+    """
     for page in range(start_page, start_page + count):
         url = f"https://armandaily.ir/category/last-news/page/{page}/"
         print(f"Processing List Page: {url}")
         
-        html, status = fetch_url(url)
+        result = http_client.fetch(url, conditional=True)
+        html, status = result.text, result.status
         
         if html:
-            links = arman_scraper.parse_archive_page(html)
-            if links:
-                print(f"Page {page}: Found {len(links)} articles.")
-                
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures = [executor.submit(process_arman_article, link, page) for link in links]
-                    
-                    for future in as_completed(futures):
-                        res = future.result()
-                        if res:
-                            results.append(res)
-                            print(f"Extracted: {res.get('Title', 'No Title')[:30]}")
+            found = arman_scraper.parse_archive_page(html)
+            links = link_index.filter_known(found, lambda link: link)
+            if link_index.page_is_known(found, links):
+                print(f"Page {page}: All articles already scraped. Stopping.")
+                return
+            tasks = [(link, page) for link in links]
+            validators.add(result, tasks, lambda task: task[0])
+            if tasks:
+                print(f"Page {page}: Found {len(tasks)} articles.")
+                yield from tasks
             else:
                 print(f"Page {page}: No articles found.")
+        elif result.not_modified:
+            print(f"Page {page}: Not modified since last run.")
+            if link_index.STOP_AT_KNOWN:
+                return
         elif status == 404:
             print(f"Page {page}: 404 Not Found.")
         else:
              print(f"Page {page}: Failed to fetch (Status: {status})")
 
-    save_batch(results, output)
+def run_arman(start_page, count, output):
+    print(f"--- Running Armandaily Scraper (Start Page: {start_page}, Count: {count}) ---")
+    validators = http_cache.PendingValidators()
+    run_article_pipeline(arman_list_items(start_page, count, validators), lambda task: process_arman_article(*task), output, validators)
 
 # -------------------------------------------------------------------------
 # Banki (AkhbarBank) Runner
 # -------------------------------------------------------------------------
 def process_banki_page(page_id):
     url = f"https://www.akhbarbank.com/news/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = banki_news.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.ok:
+        data = parse_pool.parse(banki_news.parse_html, result.text, page_id, url)
         if data:
             return data
-    elif status != 404:
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_banki(start, count, output):
-    print(f"--- Running Banki (AkhbarBank) Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_banki_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_banki(start, count, output, resume=False):
+    run_id_range('banki', "Banki (AkhbarBank)", process_banki_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Fararu Runner
 # -------------------------------------------------------------------------
 def process_fararu_page(page_id):
     url = f"https://fararu.com/fa/news/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = fararu_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.ok:
+        data = parse_pool.parse(fararu_scraper.parse_html, result.text, page_id, url)
         if data:
             return data
-    elif status != 404:
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_fararu(start, count, output):
-    print(f"--- Running Fararu Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_fararu_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_fararu(start, count, output, resume=False):
+    run_id_range('fararu', "Fararu", process_fararu_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Tasnim Runner
 # -------------------------------------------------------------------------
 def process_tasnim_page(page_id, year, month, day):
-    # Use short link for redirection to full URL with date
+    # Use short link for redirection to full URL with date.
+    # The resolved URL is cached, so re-scrapes go straight to the canonical page.
     url = f"http://tn.ai/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        # After fetch_url (requests.get), the html is the content of the FINAL url.
-        # But we need the final URL to pass to parse_html? 
-        # fetch_url returns text, status. It doesn't return the final URL.
-        # parse_html might need the final URL? 
-        # Actually tasnim_scraper.parse_html uses url mainly for metadata.
-        # But if the HTML is valid, it should work.
-        
-        # However, fetch_url in scraper.py does: response = requests.get(url, ...)
-        # It follows redirects by default.
-        # So 'html' is the content of the final page.
-        data = tasnim_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url, short_link=True):
+        return KNOWN
+    result = http_client.fetch(url, cache_redirects=True)
+    if result.ok:
+        data = parse_pool.parse(tasnim_scraper.parse_html, result.text, page_id, result.final_url)
         if data:
             return data
         else:
             # print(f"Tasnim Parse Error for {url}")
             pass
-    elif status != 404:
-        # print(f"Tasnim Fetch Error {url}: {status}")
-        pass
+    elif result.transient:
+        # print(f"Tasnim Fetch Error {url}: {result.error}")
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_tasnim(start, count, output):
-    print(f"--- Running Tasnim Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
+def run_tasnim(start, count, output, resume=False):
     # Dummy date args not needed for simple ID url but kept for signature if needed later
     year, month, day = "0", "0", "0"
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_tasnim_page, pid, year, month, day): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+    run_id_range('tasnim', "Tasnim", lambda pid: process_tasnim_page(pid, year, month, day), start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Mehr News Runner
 # -------------------------------------------------------------------------
 def process_mehr_page(page_id):
     url = f"https://www.mehrnews.com/news/{page_id}"
-    html, status = fetch_url(url)
-    if html:
-        data = mehr_scraper.parse_html(html, page_id, url)
+    if link_index.is_known(url):
+        return KNOWN
+    result = http_client.fetch(url)
+    if result.ok:
+        data = parse_pool.parse(mehr_scraper.parse_html, result.text, page_id, url)
         if data:
             return data
-    elif status != 404:
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_mehr(start, count, output):
-    print(f"--- Running Mehr News Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_mehr_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_mehr(start, count, output, resume=False):
+    run_id_range('mehr', "Mehr News", process_mehr_page, start, count, output, resume)
 
 # -------------------------------------------------------------------------
 # Mashregh Runner
 # -------------------------------------------------------------------------
 def process_mashregh_page(page_id):
-    # Try short link first (redirects usually)
-    url = f"https://mshrgh.ir/{page_id}"
-    
-    # Use cloudscraper=True
-    html, status = fetch_url(url, use_cloudscraper=True)
+    # Try short link first (redirects usually, resolution is cached)
+    short_url = f"https://mshrgh.ir/{page_id}"
+    if link_index.is_known(short_url, short_link=True):
+        return KNOWN
+    result = http_client.fetch(short_url, use_cloudscraper=True, cache_redirects=True)
     
-    if not html:
+    if not result.ok:
         # Try full URL
-        url = f"https://www.mashreghnews.ir/news/{page_id}"
-        html, status = fetch_url(url, use_cloudscraper=True)
-        
-    if html:
-        data = mashregh_scraper.parse_html(html, page_id, url)
+        result = http_client.fetch(f"https://www.mashreghnews.ir/news/{page_id}", use_cloudscraper=True)
+    
+    if result.ok:
+        data = parse_pool.parse(mashregh_scraper.parse_html, result.text, page_id, result.final_url)
         if data and data.get('Title'):
             return data
-    elif status != 404:
-        pass
+    elif result.transient:
+        return FAILED
+    elif result.error == http_client.ERROR_NOT_FOUND:
+        return MISSING
     return None
 
-def run_mashregh(start, count, output):
-    print(f"--- Running Mashregh Scraper (Starting from ID {start}, Count: {count}) ---")
-    
-    results = []
-    page_ids = range(start, start + count)
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_page = {executor.submit(process_mashregh_page, pid): pid for pid in page_ids}
-        
-        for future in as_completed(future_to_page):
-            data = future.result()
-            if data:
-                results.append(data)
-                print(f"Extracted: {data.get('Title', 'No Title')[:30]}")
-                
-    save_batch(results, output)
+def run_mashregh(start, count, output, resume=False):
+    run_id_range('mashregh', "Mashregh", process_mashregh_page, start, count, output, resume)
 
 
 # -------------------------------------------------------------------------
@@ -701,16 +713,19 @@ def run_mashregh(start, count, output):
 def process_euronews_article(url):
     html, status = fetch_url(url)
     if html:
-        return euronews_scraper.parse_html(html, 0, url)
+        return parse_pool.parse(euronews_scraper.parse_html, html, 0, url)
     return None
 
-def process_euronews_day(date_str):
+def euronews_day_links(date_str):
+    """
+    Fetches the archive page of one day and yields the links of its new articles.
+    """
     # date_str format: YYYY/MM/DD
+    print(f"Processing Date: {date_str}")
     url = f"https://parsi.euronews.com/{date_str}"
     html, status = fetch_url(url)
-    articles = []
     if html:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = soup_factory.make_soup(html, soup_factory.Regions(tags=['a']), fast=True)
         links = []
         BASE_URL = "https://parsi.euronews.com"
         target_parts = date_str.split('/')
@@ -747,15 +762,11 @@ def process_euronews_day(date_str):
                  except:
                      pass
         
-        # Parallel fetch for articles in a day
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_url = {executor.submit(process_euronews_article, link): link for link in links}
-            for future in as_completed(future_to_url):
-                data = future.result()
-                if data:
-                    articles.append(data)
-                    
-    return articles
+        if links:
+            print(f"  {date_str}: Found {len(links)} articles.")
+        else:
+            print(f"  {date_str}: No articles found.")
+        yield from link_index.filter_known(links, lambda link: link)
 
 def run_euronews(start_date_int, count_days, output):
     print(f"--- Running Euronews Scraper (Starting from {start_date_int}, Count: {count_days} days) ---")
@@ -766,32 +777,10 @@ def run_euronews(start_date_int, count_days, output):
         print("Error: Start date must be YYYYMMDD (e.g. 20240101)")
         return
     
-    results = []
-    
-    for i in range(count_days):
-        date_str = current_date.strftime("%Y/%m/%d")
-        print(f"Processing Date: {date_str} ({i+1}/{count_days})")
-        
-        day_results = process_euronews_day(date_str)
-        if day_results:
-            results.extend(day_results)
-            print(f"  Found {len(day_results)} articles.")
-            for item in day_results:
-                 t = item.get('Title') or "No Title"
-                 print(f"    - {t[:40]}")
-        else:
-            print(f"  No articles found.")
-            
-        current_date += timedelta(days=1)
-        
-        # Save every 30 days to avoid memory issues and data loss
-        if (i + 1) % 30 == 0:
-            print(f"Auto-saving batch after {i+1} days...")
-            save_batch(results, output)
-            results = [] # Clear memory
-
-    if results:
-        save_batch(results, output)
+    # DAY_WORKERS days are fetched at once, their articles share one pool
+    day_sources = (euronews_day_links((current_date + timedelta(days=i)).strftime("%Y/%m/%d"))
+                   for i in range(count_days))
+    run_article_pipeline(pipeline.merge(day_sources, DAY_WORKERS), process_euronews_article, output)
 
 
 # -------------------------------------------------------------------------
@@ -800,7 +789,7 @@ def run_euronews(start_date_int, count_days, output):
 def process_voa_article(item):
     html, status = fetch_url(item['Link'])
     if html:
-        details = voa_scraper.parse_article_page(html, item['Link'])
+        details = parse_pool.parse(voa_scraper.parse_article_page, html, item['Link'])
         if details:
             # Merge details
             item.update(details)
@@ -811,41 +800,11 @@ def process_voa_article(item):
 def run_voa(start_page, count_pages, output):
     print(f"--- Running VOA News Scraper (Starting from Page {start_page}, Count: {count_pages}) ---")
     
-    all_results = []
-    
-    for i in range(count_pages):
-        page_num = start_page + i
-        url = f"https://ir.voanews.com/iran-news?p={page_num}"
-        print(f"Processing Page {page_num}: {url}")
-        
-        html, status = fetch_url(url)
-        if not html:
-            print("  Failed to fetch page.")
-            continue
-            
-        items = voa_scraper.parse_list_page(html)
-        print(f"  Found {len(items)} items.")
-        
-        if not items:
-            print("  No items found. Stopping.")
-            break
-            
-        # Parallel Fetch Articles
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [executor.submit(process_voa_article, item) for item in items]
-            
-            for future in as_completed(futures):
-                res = future.result()
-                if res:
-                    all_results.append(res)
-                    print(f"    Extracted: {res.get('Title', 'No Title')[:40]}")
-        
-        # Auto-save every 5 pages
-        if (i + 1) % 5 == 0:
-            save_batch(all_results, output)
-            all_results = []
-            
-    save_batch(all_results, output)
+    pages = ((page_num, f"https://ir.voanews.com/iran-news?p={page_num}")
+             for page_num in range(start_page, start_page + count_pages))
+    validators = http_cache.PendingValidators()
+    run_article_pipeline(list_page_items(pages, voa_scraper.parse_list_page, validators),
+                         process_voa_article, output, validators)
 
 
 # -------------------------------------------------------------------------
@@ -854,7 +813,7 @@ def run_voa(start_page, count_pages, output):
 def process_iranintl_article(item):
     html, status = fetch_url(item['Link'])
     if html:
-        details = iranintl_scraper.parse_article_page(html, item['Link'])
+        details = parse_pool.parse(iranintl_scraper.parse_article_page, html, item['Link'])
         if details:
             item.update(details)
             item['Scraped_Date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -872,39 +831,11 @@ def run_iranintl(category, start_page, count_pages, output):
     }
     path = paths.get(category, 'iran')
     
-    all_results = []
-    
-    for i in range(count_pages):
-        page_num = start_page + i
-        url = f"https://www.iranintl.com/{path}?page={page_num}"
-        print(f"Processing Page {page_num}: {url}")
-        
-        html, status = fetch_url(url)
-        if not html:
-            print("  Failed to fetch page.")
-            continue
-            
-        items = iranintl_scraper.parse_list_page(html)
-        print(f"  Found {len(items)} items.")
-        
-        if not items:
-            print("  No items found. Stopping.")
-            break
-            
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [executor.submit(process_iranintl_article, item) for item in items]
-            
-            for future in as_completed(futures):
-                res = future.result()
-                if res:
-                    all_results.append(res)
-                    print(f"    Extracted: {res.get('Title', 'No Title')[:40]}")
-        
-        if (i + 1) % 5 == 0:
-            save_batch(all_results, output)
-            all_results = []
-            
-    save_batch(all_results, output)
+    pages = ((page_num, f"https://www.iranintl.com/{path}?page={page_num}")
+             for page_num in range(start_page, start_page + count_pages))
+    validators = http_cache.PendingValidators()
+    run_article_pipeline(list_page_items(pages, iranintl_scraper.parse_list_page, validators),
+                         process_iranintl_article, output, validators)
 
 
 # -------------------------------------------------------------------------
@@ -913,7 +844,7 @@ def run_iranintl(category, start_page, count_pages, output):
 def process_bbc_article(item):
     html, status = fetch_url(item['Link'])
     if html:
-        details = bbc_scraper.parse_article_page(html, item['Link'])
+        details = parse_pool.parse(bbc_scraper.parse_article_page, html, item['Link'])
         if details:
             item.update(details)
             item['Scraped_Date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -935,47 +866,257 @@ def run_bbc(category, start_page, count_pages, output):
     }
     topic_id = topics.get(category, 'ckdxnwvwwjnt')
     
-    all_results = []
+    # BBC Pagination usually uses ?page=X
+    pages = ((page_num, f"https://www.bbc.com/persian/topics/{topic_id}?page={page_num}")
+             for page_num in range(start_page, start_page + count_pages))
+    validators = http_cache.PendingValidators()
+    run_article_pipeline(list_page_items(pages, bbc_scraper.parse_list_page, validators),
+                         process_bbc_article, output, validators)
+
+
+# -------------------------------------------------------------------------
+# Async Engine (ID based sites)
+# -------------------------------------------------------------------------
+# URL template and parser per ID based site. Mashregh is not listed because it
+# needs cloudscraper, which has no async counterpart; it always runs on threads.
+# Templates in SHORT_LINK_SITES redirect to the canonical article URL.
+ID_SITES = {
+    'hamshahri': ("https://www.hamshahrionline.ir/news/{}", hamshahri_scraper.parse_html),
+    'kayhan': ("https://kayhan.ir/fa/news/{}", kayhan_scraper.parse_html),
+    'inn': ("https://inn.ir/news/article/{}", inn_scraper.parse_html),
+    'banki': ("https://www.akhbarbank.com/news/{}", banki_news.parse_html),
+    'fararu': ("https://fararu.com/fa/news/{}", fararu_scraper.parse_html),
+    'tasnim': ("http://tn.ai/{}", tasnim_scraper.parse_html),
+    'mehr': ("https://www.mehrnews.com/news/{}", mehr_scraper.parse_html),
+}
+SHORT_LINK_SITES = ('tasnim',)
+
+def run_id_site_async(site, start, count, output, concurrency, per_host, resume=False):
+    print(f"--- Running {site} Scraper with async engine (Starting from ID {start}, Count: {count}, Concurrency: {concurrency}) ---")
+    url_template, parse_html = ID_SITES[site]
+    short_link = site in SHORT_LINK_SITES
+    sweep = checkpoint.open_sweep(output, lambda results: save_batch(results, output), resume=resume)
+    ids, sparse = sparse_page_ids(site, sweep, sweep.checkpoint.pending(start, count), blocking=False)
     
-    for i in range(count_pages):
-        page_num = start_page + i
-        # BBC Pagination usually uses ?page=X
-        url = f"https://www.bbc.com/persian/topics/{topic_id}?page={page_num}"
-        print(f"Processing Page {page_num}: {url}")
-        
-        html, status = fetch_url(url)
-        if not html:
-            print("  Failed to fetch page.")
-            continue
-            
-        items = bbc_scraper.parse_list_page(html)
-        print(f"  Found {len(items)} items.")
-        
-        if not items:
-            print("  No items found. Stopping.")
-            break
-            
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [executor.submit(process_bbc_article, item) for item in items]
-            
-            for future in as_completed(futures):
-                res = future.result()
-                if res:
-                    all_results.append(res)
-                    print(f"    Extracted: {res.get('Title', 'No Title')[:40]}")
-        
-        if (i + 1) % 5 == 0:
-            save_batch(all_results, output)
-            all_results = []
-            
-    save_batch(all_results, output)
+    def page_ids():
+        for pid in ids:
+            if pid is not None and link_index.is_known(url_template.format(pid), short_link=short_link):
+                sweep.record(pid, None)
+                if sparse:
+                    sparse.record(pid, True)
+            else:
+                yield pid
+    
+    def on_page(page_id, data, failed, missing):
+        sweep.record(page_id, data, failed)
+        if sparse:
+            sparse.record(page_id, False if missing else True if data else None)
+    
+    try:
+        async_engine.run_id_sweep(url_template, parse_html, page_ids(),
+                                  concurrency=concurrency, per_host=per_host,
+                                  cache_redirects=short_link, on_page=on_page)
+    finally:
+        if sparse:
+            sparse.finish()
+        sweep.close()
+
+def replay_id_site(site, output):
+    """
+    Re-parses every cached page of an ID based site straight from the raw cache.
+    """
+    print(f"--- Replaying {site} from raw cache ---")
+    url_template, parse_html = ID_SITES[site]
+    prefix = url_template.split('{}')[0]
+    cache = raw_cache.get_raw_cache()
+    
+    def parse_cached(url):
+        page_id = url[len(prefix):].split('/')[0]
+        cached = cache.get(url)
+        if not page_id.isdigit() or cached is None:
+            return None
+        html, final_url = cached
+        link = final_url if site in SHORT_LINK_SITES else url
+        return parse_pool.parse(parse_html, html, int(page_id), link)
+    
+    # With --parse-processes, one thread per parse process keeps the pool busy
+    writer = pipeline.BatchWriter(lambda batch: save_batch(batch, output))
+    pages = pipeline.stream(cache.iter_urls(prefix), parse_cached, max(parse_pool.PROCESSES, 1))
+    for url, data in pages:
+        if isinstance(data, dict):
+            writer.add(data)
+    
+    writer.close()
+    print(f"Parsed {writer.count} cached pages.")
+
+
+# -------------------------------------------------------------------------
+# Sitemap / RSS Discovery
+# -------------------------------------------------------------------------
+def process_by_id(process_page, pattern):
+    """
+    Adapts an ID page processor to discovered URLs: the ID is taken from the URL.
+    """
+    regex = re.compile(pattern)
+    
+    def process(entry):
+        match = regex.search(entry.url)
+        return process_page(int(match.group(1))) if match else None
+    return process
+
+def process_canonical(parse_html, pattern, use_cloudscraper=False):
+    """
+    Like process_by_id, but for sites whose ID processors go through short links:
+    the sitemap already has the canonical URL, so it is fetched and parsed directly.
+    """
+    regex = re.compile(pattern)
+    
+    def process(entry):
+        match = regex.search(entry.url)
+        if not match:
+            return None
+        result = http_client.fetch(entry.url, use_cloudscraper=use_cloudscraper)
+        if not result.ok:
+            return None
+        return parse_pool.parse(parse_html, result.text, int(match.group(1)), result.final_url)
+    return process
+
+def entry_item(entry):
+    """
+    List item for the article processors that expect one from a list page.
+    """
+    return {
+        "Title": entry.title,
+        "Link": entry.url,
+        "Time": entry.lastmod.strftime("%Y-%m-%d %H:%M:%S") if entry.lastmod else None,
+    }
+
+# Per site: where to look (a site root whose robots.txt lists the sitemaps, or a
+# list of sitemaps/feeds), which URLs are articles, and how to process one.
+DISCOVERY_SITES = {
+    'hamshahri': ("https://www.hamshahrionline.ir", r'hamshahrionline\.ir/news/(\d+)',
+                  process_by_id(process_hamshahri_page, r'/news/(\d+)')),
+    'kayhan': ("https://kayhan.ir", r'kayhan\.ir/fa/news/(\d+)',
+               process_by_id(process_kayhan_page, r'/news/(\d+)')),
+    'inn': ("https://inn.ir", r'inn\.ir/news/(?:article/)?(\d+)',
+            process_by_id(process_inn_page, r'/news/(?:article/)?(\d+)')),
+    'banki': ("https://www.akhbarbank.com", r'akhbarbank\.com/news/(\d+)',
+              process_by_id(process_banki_page, r'/news/(\d+)')),
+    'fararu': ("https://fararu.com", r'fararu\.com/fa/news/(\d+)',
+               process_by_id(process_fararu_page, r'/news/(\d+)')),
+    'tasnim': ("https://www.tasnimnews.com", r'tasnimnews\.com/fa/news/\d{4}/\d{2}/\d{2}/(\d+)',
+               process_canonical(tasnim_scraper.parse_html, r'/news/\d{4}/\d{2}/\d{2}/(\d+)')),
+    'mehr': ("https://www.mehrnews.com", r'mehrnews\.com/news/(\d+)',
+             process_by_id(process_mehr_page, r'/news/(\d+)')),
+    'mashregh': ("https://www.mashreghnews.ir", r'mashreghnews\.ir/news/(\d+)',
+                 process_canonical(mashregh_scraper.parse_html, r'/news/(\d+)', use_cloudscraper=True)),
+    'ettelaat': ("https://www.ettelaat.com", r'ettelaat\.com/',
+                 lambda entry: process_ettelaat_article({"Link": entry.url}, None)),
+    'asianews': ("https://asianews.ir", r'asianews\.ir/',
+                 lambda entry: process_asianews_article(entry.url, entry_item(entry)['Time'])),
+    'armandaily': ("https://armandaily.ir", r'armandaily\.ir/',
+                   lambda entry: process_arman_article(entry.url, None)),
+    'euronews': ("https://parsi.euronews.com", r'parsi\.euronews\.com/\d{4}/\d{2}/\d{2}/',
+                 lambda entry: process_euronews_article(entry.url)),
+    'voa': ("https://ir.voanews.com", r'ir\.voanews\.com/a/',
+            lambda entry: process_voa_article(entry_item(entry))),
+    'iranintl': ("https://www.iranintl.com", r'iranintl\.com/',
+                 lambda entry: process_iranintl_article(entry_item(entry))),
+    'bbc': (["https://feeds.bbci.co.uk/persian/rss.xml"], r'bbc\.(?:com|co\.uk)/persian/',
+            lambda entry: process_bbc_article(entry_item(entry))),
+}
+
+def discovery_key(site):
+    # Category variants (bbc_iran, iranintl_world, ...) share one sitemap/feed
+    for prefix in ('bbc_', 'iranintl_'):
+        if site.startswith(prefix):
+            return prefix[:-1]
+    return site
+
+def run_discovery(site, output, sources=None, since=None):
+    """
+    Finds article URLs in the site's sitemaps/feeds (or the given sources,
+    which may be local files) and feeds them straight to the article parser.
+    """
+    print(f"--- Running {site} Scraper from sitemaps/feeds ---")
+    root, url_pattern, process = DISCOVERY_SITES[discovery_key(site)]
+    if not sources:
+        sources = root if isinstance(root, list) else discovery.sitemaps_from_robots(root)
+    
+    entries = (entry for entry in discovery.discover(sources, since, url_pattern)
+               if not link_index.is_known(entry.url))
+    writer = pipeline.BatchWriter(lambda batch: save_batch(batch, output))
+    for entry, data in pipeline.stream(entries, process, MAX_WORKERS):
+        if isinstance(data, dict):
+            writer.add(data)
+            print(f"Extracted: {(data.get('Title') or 'No Title')[:30]}")
+    writer.close()
+
+
+# -------------------------------------------------------------------------
+# Latest ID Probe (ID based sites)
+# -------------------------------------------------------------------------
+# Mashregh's short links need a redirect per probe, so its full URL is checked instead
+PROBE_SITES = dict(ID_SITES, mashregh=("https://www.mashreghnews.ir/news/{}", mashregh_scraper.parse_html))
+
+def id_page_exists(site, page_id):
+    """
+    True if article page_id of an ID based site exists. Raises id_probe.ProbeError
+    when the page could not be fetched (after the retries of http_client.fetch).
+    """
+    url_template, parse_html = PROBE_SITES[site]
+    url = url_template.format(page_id)
+    result = http_client.fetch(url, use_cloudscraper=site == 'mashregh')
+    if result.transient:
+        raise id_probe.ProbeError(f"Could not fetch {url} ({result.error})")
+    if not result.ok:
+        return False
+    # Kayhan answers missing articles with a normal page, so let the parser decide
+    return isinstance(parse_html(result.text, page_id, result.final_url), dict)
+
+def probe_latest_id(site, hint):
+    print(f"--- Probing latest {site} ID (from ID {hint}) ---")
+    try:
+        head = id_probe.find_latest_id(lambda pid: id_page_exists(site, pid), hint)
+    except id_probe.ProbeError as e:
+        print(f"Probe stopped: {e}. Try again later.")
+        return None
+    if head is None:
+        print(f"No article found near ID {hint}. Pass --start with a known article ID.")
+    else:
+        print(f"Latest {site} ID: {head}")
+    return head
 
+def plan_incremental(site, start, output):
+    """
+    Returns (start, count) from the last ID finished for this output (or from
+    start on the first run) up to the latest article ID, or None if nothing is new.
+    """
+    last = checkpoint.Checkpoint(checkpoint.checkpoint_path(output)).last_done()
+    head = probe_latest_id(site, last if last else start)
+    if head is None:
+        return None
+    first = last + 1 if last else start
+    if first > head:
+        print(f"No new articles since ID {last}.")
+        return None
+    return first, head - first + 1
 
 
 # -------------------------------------------------------------------------
 # Main Entry Point
 # -------------------------------------------------------------------------
+def date_arg(value):
+    """
+    argparse type for YYYY-MM-DD dates.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD")
+
 def main():
+    global MAX_WORKERS, DAY_WORKERS
     parser = argparse.ArgumentParser(description="Unified Persian News Scraper")
     
     parser.add_argument('--site', type=str, required=True, 
@@ -985,17 +1126,129 @@ def main():
     
     parser.add_argument('--start', type=int, default=1, help='Start ID/Page')
     parser.add_argument('--count', type=int, default=10, help='Count of items/pages/days')
-    parser.add_argument('--output', type=str, default=None, help='Output Excel file')
+    parser.add_argument('--output', type=str, default=None, help='Output file name (extension follows --sink)')
+    parser.add_argument('--sink', type=str, default=storage.SINK_TYPE, choices=list(storage.SINK_CLASSES),
+                        help='Storage backend for results')
+    parser.add_argument('--export-xlsx', action='store_true', help='Export the results to an Excel file at the end of the run')
+    parser.add_argument('--cache-dir', type=str, default=http_cache.CACHE_DIR, help='Directory for persistent fetch caches')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-download everything: ignore stored ETag/Last-Modified and already scraped links')
+    parser.add_argument('--until-known', action='store_true',
+                        help='Stop paginating list pages at the first page whose articles are all scraped already')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted ID sweep from its checkpoint and retry the failed IDs')
+    parser.add_argument('--flush-every', type=int, default=checkpoint.FLUSH_EVERY,
+                        help='Save results and the checkpoint of ID sweeps every this many pages')
+    parser.add_argument('--batch-size', type=int, default=pipeline.BATCH_SIZE,
+                        help='Save results in batches of this many records while the run goes on')
+    parser.add_argument('--discover', action='store_true',
+                        help="Find articles through the site's sitemaps / RSS feeds instead of IDs or list pages")
+    parser.add_argument('--sitemap', action='append', default=None,
+                        help='Sitemap, sitemap index or feed to read with --discover (URL or local file, repeatable)')
+    parser.add_argument('--since', type=date_arg, default=None,
+                        help='With --discover: skip entries last modified before this date (YYYY-MM-DD)')
+    parser.add_argument('--sparse', action='store_true',
+                        help='Stride across long runs of missing IDs; jumped IDs stay pending for a later --resume')
+    parser.add_argument('--probe', action='store_true', help='Find and print the latest article ID of an ID based site')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Sweep an ID based site from the last finished ID (first run: --start) up to the latest article')
+    parser.add_argument('--probe-window', type=int, default=id_probe.WINDOW,
+                        help='Fewest consecutive missing IDs before the probe assumes it passed the latest article '
+                             '(widened automatically on sites with sparse IDs)')
+    parser.add_argument('--raw-cache', action='store_true', help='Store the raw HTML of every fetched page in the cache directory')
+    parser.add_argument('--replay', action='store_true', help='Parse pages from the raw HTML cache instead of the network (implies --refresh for already scraped links)')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Number of parallel workers (and pooled connections per host)')
+    parser.add_argument('--day-workers', type=int, default=DAY_WORKERS,
+                        help='Days crawled at once by ettelaat and euronews')
+    parser.add_argument('--html-parser', type=str, default=soup_factory.PARSER, choices=['lxml', 'html.parser'],
+                        help='HTML parser for the site parsers (html.parser parses whole pages, as before)')
+    parser.add_argument('--html-engine', type=str, default=soup_factory.ENGINE, choices=['bs4', 'selectolax'],
+                        help='selectolax parses much faster (needs selectolax); parsers that need BeautifulSoup keep using it')
+    parser.add_argument('--parse-processes', type=int, nargs='?', default=parse_pool.PROCESSES, const=-1,
+                        help='Parse pages in this many processes (default: off; without a number: one per CPU core)')
+    parser.add_argument('--max-bytes', type=int, default=http_client.MAX_BYTES, help='Skip responses larger than this many bytes')
+    parser.add_argument('--engine', type=str, default='threads', choices=['threads', 'async'],
+                        help='Fetch engine. "async" is available for ID based sites')
+    parser.add_argument('--concurrency', type=int, default=async_engine.CONCURRENCY, help='Requests in flight with --engine async')
+    parser.add_argument('--per-host', type=int, default=async_engine.PER_HOST_LIMIT, help='Max connections per host with --engine async')
     
     args = parser.parse_args()
     
+    MAX_WORKERS = args.workers
+    DAY_WORKERS = args.day_workers
+    http_client.configure(pool_size=MAX_WORKERS, max_bytes=args.max_bytes)
+    # Start each host at the parallelism asked for (one request per second per
+    # slot); the limiter grows from there until the host throttles us
+    slots = min(args.concurrency, args.per_host) if args.engine == 'async' else MAX_WORKERS
+    rate_limiter.configure(rate=slots, concurrency=slots)
+    http_cache.configure(cache_dir=args.cache_dir, conditional=not args.refresh)
+    storage.configure(sink_type=args.sink)
+    # A replay re-parses pages that were saved before, so known links must not be skipped
+    link_index.configure(enabled=not (args.refresh or args.replay), stop_at_known=args.until_known)
+    checkpoint.configure(flush_every=args.flush_every)
+    pipeline.configure(batch_size=args.batch_size)
+    id_probe.configure(window=args.probe_window)
+    sparse_ids.configure(enabled=args.sparse)
+    soup_factory.configure(parser=args.html_parser, engine=args.html_engine)
+    parse_pool.configure(processes=args.parse_processes)
+    parse_pool.start()
+    if args.replay:
+        raw_cache.configure(mode='replay')
+    elif args.raw_cache:
+        raw_cache.configure(mode='store')
+    
+    try:
+        run_site(args)
+    finally:
+        # Save what is still buffered (e.g. after Ctrl-C), then flush/close the sinks
+        # and write the optional Excel export once at the end
+        pipeline.close_all()
+        parse_pool.shutdown()
+        storage.close_all(export=args.export_xlsx)
+
+def run_site(args):
+    if args.discover:
+        if discovery_key(args.site) not in DISCOVERY_SITES:
+            print(f"Discovery is not available for {args.site}.")
+            return
+        out = args.output if args.output else f"{args.site}.xlsx"
+        run_discovery(args.site, out, args.sitemap, args.since)
+        return
+    
+    if args.replay and args.site in ID_SITES:
+        out = args.output if args.output else f"{args.site}.xlsx"
+        replay_id_site(args.site, out)
+        return
+    
+    if args.probe or args.incremental:
+        if args.site not in PROBE_SITES:
+            print("--probe/--incremental are only available for ID based sites.")
+            return
+        if args.probe:
+            probe_latest_id(args.site, args.start)
+            return
+        out = args.output if args.output else f"{args.site}.xlsx"
+        planned = plan_incremental(args.site, args.start, out)
+        if planned is None:
+            return
+        # Keep the checkpoint: it is where the next incremental run starts
+        args.start, args.count = planned
+        args.resume = True
+    
+    if args.engine == 'async':
+        if args.site in ID_SITES:
+            out = args.output if args.output else f"{args.site}.xlsx"
+            run_id_site_async(args.site, args.start, args.count, out, args.concurrency, args.per_host, args.resume)
+            return
+        print(f"Async engine is not available for {args.site}. Falling back to threads.")
+    
     if args.site == 'hamshahri':
         out = args.output if args.output else "hamshahri.xlsx"
-        run_hamshahri(args.start, args.count, out)
+        run_hamshahri(args.start, args.count, out, args.resume)
         
     elif args.site == 'kayhan':
         out = args.output if args.output else "kayhan.xlsx"
-        run_kayhan(args.start, args.count, out)
+        run_kayhan(args.start, args.count, out, args.resume)
         
     elif args.site == 'ettelaat':
         out = args.output if args.output else "ettelaat.xlsx"
@@ -1012,7 +1265,7 @@ def main():
 
     elif args.site == 'inn':
         out = args.output if args.output else "inn.xlsx"
-        run_inn(args.start, args.count, out)
+        run_inn(args.start, args.count, out, args.resume)
 
     elif args.site == 'armandaily':
         out = args.output if args.output else "armandaily.xlsx"
@@ -1020,23 +1273,23 @@ def main():
 
     elif args.site == 'banki':
         out = args.output if args.output else "banki.xlsx"
-        run_banki(args.start, args.count, out)
+        run_banki(args.start, args.count, out, args.resume)
 
     elif args.site == 'fararu':
         out = args.output if args.output else "fararu.xlsx"
-        run_fararu(args.start, args.count, out)
+        run_fararu(args.start, args.count, out, args.resume)
 
     elif args.site == 'tasnim':
         out = args.output if args.output else "tasnim.xlsx"
-        run_tasnim(args.start, args.count, out)
+        run_tasnim(args.start, args.count, out, args.resume)
 
     elif args.site == 'mehr':
         out = args.output if args.output else "mehr.xlsx"
-        run_mehr(args.start, args.count, out)
+        run_mehr(args.start, args.count, out, args.resume)
 
     elif args.site == 'mashregh':
         out = args.output if args.output else "mashregh.xlsx"
-        run_mashregh(args.start, args.count, out)
+        run_mashregh(args.start, args.count, out, args.resume)
 
     elif args.site == 'euronews':
         out = args.output if args.output else "euronews.xlsx"
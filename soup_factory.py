@@ -0,0 +1,196 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+# Build only the regions a parser declares (scraper.py --html-parser html.parser turns it off too)
+STRAIN = True
+# 'bs4' or 'selectolax' (scraper.py --html-engine). selectolax is only used
+# by parsers that ask for it with make_soup(..., fast=True)
+ENGINE = 'bs4'
+
+class Regions(SoupStrainer):
+    """
+    Parse-only filter for the parts of a page a parser reads: every element
+    that is one of tags, has one of classes or ids, a class containing one of
+    class_contains, or one of the attrs (name -> value) is kept together with
+    everything inside it. The rest of the page (scripts, menus, footers, ...)
+    is never turned into Tag objects.
+    """
+
+    def __init__(self, tags=(), classes=(), ids=(), class_contains=(), attrs=None):
+        SoupStrainer.__init__(self)
+        self.tags = set(tags)
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.class_contains = tuple(class_contains)
+        self.wanted_attrs = attrs or {}
+
+    def wants(self, name, attrs):
+        if name in self.tags:
+            return True
+        attrs = attrs or {}
+        classes = attrs.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        if self.classes.intersection(classes):
+            return True
+        if any(part in cls for cls in classes for part in self.class_contains):
+            return True
+        if attrs.get('id') in self.ids:
+            return True
+        return any(attrs.get(key) == value for key, value in self.wanted_attrs.items())
+
+    # bs4 >= 4.13
+    @property
+    def excludes_everything(self):
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.wants(name, attrs)
+
+    def allow_string_creation(self, string):
+        # Only strings outside of every kept region get here
+        return False
+
+    # bs4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self.wants(markup_name, dict(markup_attrs or {}))
+
+    def search(self, markup):
+        return None
+
+class FastNode:
+    """
+    BeautifulSoup-like view of a selectolax (lexbor) node, covering the
+    lookups the site parsers use: find, find_all, select, select_one,
+    get_text and get. find/find_all arguments are turned into one CSS
+    selector, so the search itself runs in C.
+    """
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    def _matches(self, selector):
+        # Like BeautifulSoup, only search below this node, not the node itself
+        own_id = self.node.mem_id
+        return [node for node in self.node.css(selector) if node.mem_id != own_id]
+
+    def find_all(self, name=None, attrs=None, limit=None, class_=None, **kwargs):
+        attrs = dict(attrs or {}, **kwargs)
+        if class_ is not None:
+            attrs['class'] = class_
+        selector, checks = _selector(name, attrs)
+        nodes = self._matches(selector)
+        if checks:
+            nodes = [node for node in nodes if all(check(node) for check in checks)]
+        if limit:
+            nodes = nodes[:limit]
+        return [FastNode(node) for node in nodes]
+
+    def find(self, name=None, attrs=None, class_=None, **kwargs):
+        found = self.find_all(name, attrs, limit=1, class_=class_, **kwargs)
+        return found[0] if found else None
+
+    def select(self, selector):
+        return [FastNode(node) for node in self._matches(selector)]
+
+    def select_one(self, selector):
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def get_text(self, separator='', strip=False):
+        if not strip:
+            return self.node.text(separator=separator)
+        # selectolax keeps the empty strings between separators, BeautifulSoup drops them
+        parts = self.node.text(separator='\0', strip=True).split('\0')
+        return separator.join(part for part in parts if part)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def get(self, key, default=None):
+        attributes = self.node.attributes
+        if key not in attributes:
+            return default
+        # Attributes without a value, like <input disabled>
+        return attributes[key] if attributes[key] is not None else ''
+
+def _quote(value):
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _selector(name, attrs):
+    """
+    CSS selector for find(name, attrs), plus Python checks for what CSS
+    cannot express (callable values).
+    """
+    conditions = ''
+    checks = []
+    for key, value in attrs.items():
+        if callable(value):
+            checks.append(_attr_check(key, value))
+        elif value is True:
+            conditions += f'[{key}]'
+        elif value is None or value is False:
+            # BeautifulSoup reads attr=None as "attribute absent"
+            conditions += f':not([{key}])'
+        elif key == 'class' and ' ' not in value:
+            # class_='a' matches one of the classes, like in BeautifulSoup
+            conditions += f'[class~={_quote(value)}]'
+        else:
+            conditions += f'[{key}={_quote(value)}]'
+    names = [name] if isinstance(name, str) else list(name or ['*'])
+    return ', '.join(tag + conditions for tag in names), checks
+
+def _attr_check(key, func):
+    def check(node):
+        value = node.attributes.get(key)
+        if key == 'class' and value:
+            return any(func(cls) for cls in value.split()) or func(value)
+        return func(value)
+    return check
+
+def make_soup(html, regions=None, fast=False):
+    """
+    Parses html with lxml (html.parser if lxml is not installed). With
+    regions, only those parts of the page are built.
+    Parsers that only use the lookups FastNode supports pass fast=True; they
+    get a selectolax document instead when ENGINE is 'selectolax'. The others
+    (e.g. Kayhan, which edits the tree with decompose()) always get BeautifulSoup.
+    """
+    if fast and ENGINE == 'selectolax':
+        tree = LexborHTMLParser(html)
+        # BeautifulSoup leaves script and style contents out of get_text()
+        tree.strip_tags(['script', 'style'])
+        return FastNode(tree.root)
+    if regions is not None and STRAIN:
+        return BeautifulSoup(html, PARSER, parse_only=regions)
+    return BeautifulSoup(html, PARSER)
+
+def configure(parser=None, engine=None):
+    global PARSER, STRAIN, ENGINE
+    if parser:
+        PARSER = parser
+        # html.parser is the reference: whole pages, as before
+        STRAIN = parser != 'html.parser'
+    if engine:
+        if engine == 'selectolax' and not HAS_SELECTOLAX:
+            print("Warning: selectolax not found. Falling back to BeautifulSoup.")
+            engine = 'bs4'
+        ENGINE = engine
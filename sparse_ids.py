@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import threading
+from collections import deque
+
+import checkpoint
+import http_cache
+
+# Adaptive skipping of dead ID regions (scraper.py --sparse). IDs it jumps
+# over are not fetched in that run, so it is off by default.
+ENABLED = False
+# Missing IDs in a row before the sweep starts skipping. The stride then
+# doubles every time the dead run doubles in length, up to MAX_STRIDE.
+DEAD_RUN = 50
+MAX_STRIDE = 32
+
+class DeadRanges:
+    """
+    IDs of a site that answered 404, kept across runs in a JSON file so
+    dead regions are never probed twice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        ranges = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                ranges = json.load(f)
+        self.ids = checkpoint.RangeSet(ranges)
+
+    def __contains__(self, page_id):
+        with self.lock:
+            return page_id in self.ids
+
+    def add(self, ranges):
+        with self.lock:
+            for first, last in ranges:
+                self.ids.add_range(first, last)
+
+    def save(self):
+        with self.lock:
+            checkpoint.write_json(self.path, self.ids.ranges)
+
+def get_dead_ranges(site):
+    return DeadRanges(os.path.join(http_cache.CACHE_DIR, 'dead_ids', f"{site}.json"))
+
+class SparseIds:
+    """
+    Feeds the IDs of a sweep in ascending order, but strides across long
+    runs of missing articles: after DEAD_RUN IDs without a hit only every
+    stride-th ID is fetched. When a strided probe finds an article, the IDs
+    it jumped over are fetched after all and the stride drops back to 1.
+    IDs in known dead ranges are not fetched at all.
+
+    The sweep reports every outcome with record(). Jumped IDs are given up
+    once a probe DEAD_RUN IDs further up missed as well. They were never
+    fetched, so they are neither stored as dead nor passed to on_skip: they
+    stay pending in the checkpoint and the next --resume run without
+    --sparse fetches them. on_skip(ids) only gets IDs of known dead ranges.
+    With blocking=False the iterator yields None instead of waiting for
+    outstanding probes (for the asyncio engine).
+    """
+
+    def __init__(self, page_ids, dead=None, on_skip=None, blocking=True):
+        self.page_ids = page_ids
+        self.dead = dead
+        self.on_skip = on_skip
+        self.blocking = blocking
+        self.cond = threading.Condition()
+        self.anchor = None      # highest ID with an article so far (or the first ID)
+        self.miss_streak = 0    # missing IDs above the anchor
+        self.max_hit = None
+        self.misses = checkpoint.RangeSet()
+        self.backfill = deque()
+        self.strided = {}       # probe ID -> IDs it jumped over
+        self.held = {}          # missed probe ID -> IDs it jumped over, not yet settled
+        self.skipped = 0        # IDs in known dead ranges
+        self.jumped = 0         # IDs given up without a fetch
+
+    def _stride(self):
+        # Based on outcomes, not on how far ahead IDs were handed out: the
+        # pipeline queues many IDs before the first results come back
+        if self.miss_streak <= DEAD_RUN:
+            return 1
+        return min(MAX_STRIDE, 2 ** (int(math.log2(self.miss_streak / DEAD_RUN)) + 1))
+
+    def _next_backfill(self):
+        with self.cond:
+            return self.backfill.popleft() if self.backfill else None
+
+    def __iter__(self):
+        jumped = []
+        for page_id in self.page_ids:
+            backfill = self._next_backfill()
+            while backfill is not None:
+                yield backfill
+                backfill = self._next_backfill()
+
+            if self.dead is not None and page_id in self.dead:
+                self.skipped += 1
+                if self.on_skip:
+                    self.on_skip([page_id])
+                continue
+
+            with self.cond:
+                if self.anchor is None:
+                    self.anchor = page_id
+                if len(jumped) < self._stride() - 1:
+                    jumped.append(page_id)
+                    continue
+                if jumped:
+                    self.strided[page_id] = jumped
+            jumped = []
+            yield page_id
+
+        # The tail of the range was jumped over without a probe at its end
+        if jumped:
+            with self.cond:
+                self.strided[jumped[-1]] = jumped[:-1]
+            yield jumped[-1]
+
+        # Wait for the outstanding probes; a late hit still needs its backfill
+        while True:
+            with self.cond:
+                if self.backfill:
+                    page_id = self.backfill.popleft()
+                elif not self.strided:
+                    return
+                elif self.blocking:
+                    self.cond.wait(0.5)
+                    continue
+                else:
+                    page_id = None
+            yield page_id
+
+    def record(self, page_id, live):
+        """
+        live: True if the ID has an article, False if it answered 404, None
+        otherwise (failed fetch, or a page without an article).
+        """
+        with self.cond:
+            jumped = self.strided.pop(page_id, None)
+            if live:
+                if page_id > self.anchor:
+                    self.anchor = page_id
+                    self.miss_streak = 0
+                self.max_hit = page_id if self.max_hit is None else max(self.max_hit, page_id)
+                if jumped:
+                    self.backfill.extend(jumped)
+                # Articles come in clusters: fetch what was jumped over just below a hit
+                for probe, held in list(self.held.items()):
+                    if held[-1] >= page_id - DEAD_RUN:
+                        self.backfill.extend(self.held.pop(probe))
+            elif live is None:
+                # Unknown outcome: do not guess, fetch the jumped IDs as well
+                if jumped:
+                    self.backfill.extend(jumped)
+            else:
+                self.misses.add(page_id)
+                if page_id > self.anchor:
+                    self.miss_streak += 1 + len(jumped or [])
+                if jumped and jumped[0] - self.anchor <= DEAD_RUN:
+                    # A hit came in after this probe was handed out: densify around it
+                    self.backfill.extend(jumped)
+                elif jumped:
+                    self.held[page_id] = jumped
+            self._give_up(lambda probe: live is False and probe < page_id - DEAD_RUN)
+            self.cond.notify_all()
+
+    def _give_up(self, is_dead):
+        for probe in [probe for probe in self.held if is_dead(probe)]:
+            self.jumped += len(self.held.pop(probe))
+
+    def finish(self):
+        """
+        Gives up the remaining jumped IDs and stores the 404 ranges found by
+        this sweep. Only ranges below the highest article are kept: IDs past
+        it may simply not be published yet.
+        """
+        with self.cond:
+            self._give_up(lambda probe: True)
+        if self.skipped:
+            print(f"Skipped {self.skipped} IDs in known dead regions.")
+        if self.jumped:
+            print(f"Jumped over {self.jumped} IDs in dead regions without fetching them. "
+                  f"Run again with --resume (without --sparse) to fetch them.")
+        if self.dead is None or self.max_hit is None:
+            return
+        with self.cond:
+            ranges = [(first, min(last, self.max_hit - 1)) for first, last in self.misses.ranges
+                      if first < self.max_hit]
+        self.dead.add(ranges)
+        self.dead.save()
+
+def configure(enabled=None):
+    global ENABLED
+    if enabled is not None:
+        ENABLED = enabled
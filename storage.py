@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import persian_date
+
+# Sink used by save_batch (scraper.py --sink). Every backend except xlsx appends
+# a batch in time proportional to the batch, no matter how large the output is.
+SINK_TYPE = 'sqlite'
+
+EXTENSIONS = {
+    'sqlite': '.sqlite',
+    'jsonl': '.jsonl',
+    'parquet': '.parquet',
+    'xlsx': '.xlsx',
+}
+
+def dedupe_frame(df):
+    """
+    Keeps the last record per Link (or per Page when there are no links).
+    """
+    if 'Link' in df.columns and df['Link'].notna().any():
+        return df.drop_duplicates(subset=['Link'], keep='last')
+    elif 'Page' in df.columns:
+        return df.drop_duplicates(subset=['Page'], keep='last')
+    return df
+
+def to_frame(records, columns):
+    """
+    Builds a DataFrame with exactly the given columns from a list of dicts (or a DataFrame).
+    """
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    # Ensure all columns exist
+    for col in columns:
+        if col not in df.columns:
+            df[col] = None
+    return df[columns]
+
+def fill_gregorian_dates(records):
+    """
+    Fills the missing Gregorian_Date of a batch of records from their Time,
+    converting the Time values of the batch in one pass.
+    """
+    missing = [record for record in records if not record.get('Gregorian_Date') and record.get('Time')]
+    if not missing:
+        return
+    dates = persian_date.to_gregorian_series([str(record['Time']) for record in missing])
+    for record, value in zip(missing, dates):
+        record['Gregorian_Date'] = value
+
+def fill_gregorian_column(df):
+    """
+    fill_gregorian_dates() for a DataFrame with Time and Gregorian_Date columns.
+    """
+    if 'Time' not in df.columns or 'Gregorian_Date' not in df.columns:
+        return df
+    missing = df['Gregorian_Date'].isna() & df['Time'].notna()
+    if missing.any():
+        df = df.copy()
+        df['Gregorian_Date'] = df['Gregorian_Date'].astype(object)
+        df.loc[missing, 'Gregorian_Date'] = persian_date.to_gregorian_series(df.loc[missing, 'Time'].astype(str))
+    return df
+
+def record_key(record):
+    """
+    Deduplication key of a record, mirroring dedupe_frame.
+    """
+    if record.get('Link'):
+        return str(record['Link'])
+    if record.get('Page') is not None:
+        return f"page:{record['Page']}"
+    return None
+
+class ExcelSink:
+    """
+    Legacy backend: rewrites the whole workbook on every batch.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+
+    def write(self, records):
+        new_df = to_frame(records, self.columns)
+
+        if os.path.exists(self.path):
+            try:
+                existing_df = pd.read_excel(self.path)
+                updated_df = dedupe_frame(pd.concat([existing_df, new_df], ignore_index=True))
+            except Exception as e:
+                print(f"Error reading existing file: {e}")
+                updated_df = new_df
+        else:
+            updated_df = new_df
+
+        updated_df.to_excel(self.path, index=False)
+        print(f"Saved {len(records)} new records. Total records: {len(updated_df)} in {self.path}")
+
+    def read_frame(self):
+        if not os.path.exists(self.path):
+            return to_frame([], self.columns)
+        return pd.read_excel(self.path)
+
+    def close(self):
+        pass
+
+class SQLiteSink:
+    """
+    One table, one row per record. Link (or Page) is the primary key, so a
+    re-scraped article replaces the old row instead of being duplicated.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        column_defs = ", ".join(f'"{col}"' for col in columns)
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS records (_key TEXT PRIMARY KEY, {column_defs})')
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        self.insert_sql = f'INSERT OR REPLACE INTO records (_key, {column_defs}) VALUES ({placeholders})'
+
+    def write(self, records):
+        rows = []
+        for record in records:
+            values = [record.get(col) for col in self.columns]
+            # SQLite only stores plain scalars
+            values = [v if v is None or isinstance(v, (int, float, str)) else str(v) for v in values]
+            rows.append([record_key(record)] + values)
+
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(self.insert_sql, rows)
+            total = self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        print(f"Saved {len(records)} new records. Total records: {total} in {self.path}")
+
+    def read_frame(self):
+        with self.lock:
+            df = pd.read_sql_query("SELECT * FROM records ORDER BY rowid", self.conn)
+        return df.drop(columns=['_key'])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class JSONLSink:
+    """
+    One JSON object per line, appended. Duplicates are dropped on export.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, records):
+        lines = []
+        for record in records:
+            row = {col: record.get(col) for col in self.columns}
+            lines.append(json.dumps(row, ensure_ascii=False, default=str))
+
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+            self.count += len(records)
+        print(f"Saved {len(records)} new records ({self.count} this run) to {self.path}")
+
+    def read_frame(self):
+        if not os.path.exists(self.path):
+            return to_frame([], self.columns)
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+        return dedupe_frame(to_frame(records, self.columns))
+
+    def close(self):
+        pass
+
+def _as_text(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+class ParquetSink:
+    """
+    Parquet dataset: a directory with one part file per batch.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.lock = threading.Lock()
+        self.count = 0
+        os.makedirs(path, exist_ok=True)
+        self.next_part = len([f for f in os.listdir(path) if f.endswith('.parquet')])
+
+    def write(self, records):
+        # Parquet needs one type per column; the scrapers mix ints and strings (e.g. Page)
+        rows = [{col: _as_text(record.get(col)) for col in self.columns} for record in records]
+        df = pd.DataFrame(rows, columns=self.columns)
+
+        with self.lock:
+            part_path = os.path.join(self.path, f"part-{self.next_part:05d}.parquet")
+            self.next_part += 1
+            df.to_parquet(part_path, index=False)
+            self.count += len(records)
+        print(f"Saved {len(records)} new records ({self.count} this run) to {self.path}")
+
+    def read_frame(self):
+        if not os.listdir(self.path):
+            return to_frame([], self.columns)
+        return dedupe_frame(pd.read_parquet(self.path))
+
+    def close(self):
+        pass
+
+SINK_CLASSES = {
+    'sqlite': SQLiteSink,
+    'jsonl': JSONLSink,
+    'parquet': ParquetSink,
+    'xlsx': ExcelSink,
+}
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+def sink_path(output):
+    base, _ = os.path.splitext(output)
+    return base + EXTENSIONS[SINK_TYPE]
+
+def get_sink(output, columns):
+    """
+    Returns the sink for an output name; the extension follows SINK_TYPE
+    (e.g. hamshahri.xlsx -> hamshahri.sqlite).
+    """
+    path = sink_path(output)
+    with _sinks_lock:
+        sink = _sinks.get(path)
+        if sink is None:
+            sink = SINK_CLASSES[SINK_TYPE](path, columns)
+            _sinks[path] = sink
+    return sink
+
+def export_xlsx(sink, xlsx_path):
+    df = fill_gregorian_column(dedupe_frame(to_frame(sink.read_frame(), sink.columns)))
+    df.to_excel(xlsx_path, index=False)
+    print(f"Exported {len(df)} records to {xlsx_path}")
+
+def close_all(export=False):
+    """
+    Closes all sinks opened in this run, optionally exporting each to .xlsx first.
+    """
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        if export and not isinstance(sink, ExcelSink):
+            try:
+                export_xlsx(sink, os.path.splitext(sink.path)[0] + '.xlsx')
+            except Exception as e:
+                print(f"Error exporting {sink.path} to Excel: {e}")
+        sink.close()
+
+def configure(sink_type=None):
+    global SINK_TYPE
+    if sink_type:
+        SINK_TYPE = sink_type
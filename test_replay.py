@@ -0,0 +1,48 @@
+import sys
+
+import http_cache
+import link_index
+import raw_cache
+import scraper
+import storage
+
+LIST_URL = "https://ir.voanews.com/iran-news?p=1"
+LIST_PAGE = """<html><body><ul>
+<li class="archive-list__item"><a class="img-wrap" href="/a/first/1.html"></a>
+<h4 class="media-block__title">First</h4><span class="date">۲۴ آبان ۱۴۰۳</span></li>
+<li class="archive-list__item"><a class="img-wrap" href="/a/second/2.html"></a>
+<h4 class="media-block__title">Second</h4><span class="date">۲۵ آبان ۱۴۰۳</span></li>
+</ul></body></html>"""
+ARTICLE_PAGE = """<html><body><h1 class="title">{title}</h1>
+<time datetime="2024-11-14T10:30:00+03:30">۲۴ آبان ۱۴۰۳</time>
+<div class="wsw"><p>Body of {title}</p></div></body></html>"""
+
+def test_replay_reparses_saved_run(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    # main() configures these module settings; put them back afterwards
+    monkeypatch.setattr(http_cache, "CACHE_DIR", cache_dir)
+    monkeypatch.setattr(raw_cache, "MODE", None)
+    monkeypatch.setattr(raw_cache, "_cache", None)
+    monkeypatch.setattr(link_index, "_index", None)
+    monkeypatch.setattr(link_index, "ENABLED", True)
+    monkeypatch.setattr(link_index, "STOP_AT_KNOWN", False)
+
+    # What a --raw-cache run leaves behind: the raw pages, and the saved links in the index
+    cache = raw_cache.get_raw_cache()
+    cache.put(LIST_URL, LIST_URL, LIST_PAGE)
+    links = []
+    for name, title in (("first/1", "First"), ("second/2", "Second")):
+        link = f"https://ir.voanews.com/a/{name}.html"
+        cache.put(link, link, ARTICLE_PAGE.format(title=title))
+        links.append(link)
+    link_index.get_index().add_many(links)
+
+    output = str(tmp_path / "voa.xlsx")
+    monkeypatch.setattr(sys, "argv", ["scraper.py", "--site", "voa", "--start", "1", "--count", "1",
+                                      "--replay", "--until-known", "--cache-dir", cache_dir,
+                                      "--output", output])
+    scraper.main()
+
+    df = storage.SQLiteSink(str(tmp_path / "voa.sqlite"), scraper.COLUMNS).read_frame()
+    assert sorted(df["Link"]) == links
+    assert sorted(df["Full_Text"]) == ["Body of First", "Body of Second"]
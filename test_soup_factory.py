@@ -0,0 +1,52 @@
+import pytest
+
+import soup_factory
+
+PAGE = """<html><body>
+<h1 class="title main">Title</h1>
+<div class="wsw body" id="content"><p>One</p><p> Two </p><script>skip()</script></div>
+<img src="/a.jpg" alt="Title" loading="eager">
+<img src="/b.jpg">
+<img src="/c.jpg" alt="">
+<a href="/x" data-id="1">x</a><a href="/y">y</a>
+</body></html>"""
+
+# (name, attrs) pairs given to find_all on both engines
+LOOKUPS = [
+    ('h1', {'class': 'title'}),
+    ('div', {'id': 'content'}),
+    ('img', {'alt': 'Title'}),
+    ('img', {'alt': True}),
+    ('img', {'alt': None}),
+    ('img', {'alt': False}),
+    ('a', {'data-id': None}),
+    ('a', {'href': lambda href: href and href.startswith('/x')}),
+    (['h1', 'img'], {}),
+]
+
+def soups(monkeypatch):
+    soup = soup_factory.make_soup(PAGE)
+    monkeypatch.setattr(soup_factory, 'ENGINE', 'selectolax')
+    fast = soup_factory.make_soup(PAGE, fast=True)
+    return soup, fast
+
+def describe(tags):
+    return [(tag.name, tag.get('src') or tag.get('href') or tag.get_text(strip=True)) for tag in tags]
+
+@pytest.mark.skipif(not soup_factory.HAS_SELECTOLAX, reason="selectolax is not installed")
+@pytest.mark.parametrize("name, attrs", LOOKUPS)
+def test_find_all_matches_beautifulsoup(name, attrs, monkeypatch):
+    soup, fast = soups(monkeypatch)
+    assert describe(fast.find_all(name, attrs)) == describe(soup.find_all(name, attrs))
+
+@pytest.mark.skipif(not soup_factory.HAS_SELECTOLAX, reason="selectolax is not installed")
+def test_find_with_none_keyword_matches_beautifulsoup(monkeypatch):
+    soup, fast = soups(monkeypatch)
+    # inn_scraper looks up find('img', alt=title) with a title that may be None
+    assert describe([fast.find('img', alt=None)]) == describe([soup.find('img', alt=None)])
+
+@pytest.mark.skipif(not soup_factory.HAS_SELECTOLAX, reason="selectolax is not installed")
+def test_get_text_matches_beautifulsoup(monkeypatch):
+    soup, fast = soups(monkeypatch)
+    for selector in ('div.wsw', 'h1'):
+        assert fast.select_one(selector).get_text(' ', strip=True) == soup.select_one(selector).get_text(' ', strip=True)